@@ -428,9 +428,9 @@ def generate_shifted_tapes(tape, index, shifts, multipliers=None, broadcast=Fals
     )
 
 
-def generate_multishifted_tapes(tape, indices, shifts, multipliers=None):
-    r"""Generate a list of tapes where multiple marked trainable
-    parameters have been shifted by the provided shift values.
+def generate_multishifted_tapes(tape, indices, shifts, multipliers=None, broadcast=False):
+    r"""Generate a list of tapes or a single broadcasted tape, where multiple marked
+    trainable parameters have been shifted by the provided shift values.
 
     Args:
         tape (.QuantumTape): input quantum tape
@@ -443,17 +443,37 @@ def generate_multishifted_tapes(tape, indices, shifts, multipliers=None):
             of multiplier values of the same format as `shifts``. Each multiplier
             scales the corresponding gate parameter before the shift is applied.
             If not provided, the parameters will not be scaled.
+        broadcast (bool): Whether or not to use broadcasting to create a single tape
+            with the shifted parameters.
 
     Returns:
         list[QuantumTape]: List of quantum tapes. Each tape has the marked parameters
             indicated by ``indices`` shifted by the values of ``shifts``. The number
             of tapes will match the summed lengths of all inner sequences in ``shifts``
             and ``multipliers`` (if provided).
+            If ``broadcast=True`` was used, the list contains a single broadcasted tape
+            with all shifts distributed over the broadcasting dimension. In this case,
+            the ``batch_size`` of the returned tape matches the length of ``shifts``.
     """
     params = list(tape.get_parameters())
     if multipliers is None:
         multipliers = np.ones_like(shifts)
 
+    if broadcast:
+        new_params = params.copy()
+        shifted_tape = tape.copy(copy_operations=True)
+        # Distribute the shifts of each marked parameter over the broadcasting dimension
+        for idx, _shifts, _multipliers in zip(
+            indices, qml.math.transpose(shifts), qml.math.transpose(multipliers)
+        ):
+            dtype = getattr(new_params[idx], "dtype", float)
+            new_params[idx] = new_params[idx] * qml.math.convert_like(_multipliers, new_params[idx])
+            new_params[idx] = new_params[idx] + qml.math.convert_like(_shifts, new_params[idx])
+            new_params[idx] = qml.math.cast(new_params[idx], dtype)
+
+        shifted_tape.set_parameters(new_params)
+        return [shifted_tape]
+
     tapes = []
 
     for _shifts, _multipliers in zip(shifts, multipliers):
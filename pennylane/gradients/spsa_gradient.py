@@ -38,7 +38,16 @@ from .gradient_transform import (
 from .general_shift_rules import generate_multishifted_tapes
 
 
-def _rademacher_sampler(indices, num_params, *args, seed=None):
+# Signs of the Rademacher sampler, indexed by a random bit. They are stored as 8-bit
+# integers, which are cast to floats when computing the shifts and coefficients.
+_RADEMACHER_SIGNS = np.array([1, -1], dtype=np.int8)
+
+# Minimal number of samples for which the Rademacher sampler draws packed random bits. For
+# fewer samples, comparing uniform samples to 1/2 is faster due to its smaller per-call overhead.
+_PACKED_BITS_THRESHOLD = 2048
+
+
+def _rademacher_sampler(indices, num_params, *args, seed=None, rng=None, num_directions=None):
     r"""Sample a random vector with (independent) entries from {+1, -1} with balanced probability.
     That is, each entry follows the
     `Rademacher distribution. <https://en.wikipedia.org/wiki/Rademacher_distribution>`_
@@ -48,17 +57,104 @@ def _rademacher_sampler(indices, num_params, *args, seed=None):
     Args:
         indices (Sequence[int]): Indices of the trainable tape parameters that will be perturbed.
         num_params (int): Total number of trainable tape parameters.
+        seed (int or Sequence[int] or None): Seed for the random number generator.
+        rng (numpy.random.Generator or None): Random number generator to draw the entries from.
+            Takes precedence over ``seed``.
+        num_directions (int or None): If provided, sample this many independent vectors
+            at once and return them as the rows of a matrix.
 
     Returns:
-        tensor_like: Vector of size ``num_params`` with non-zero entries at positions indicated
-        by ``indices``, each entry sampled independently from the Rademacher distribution.
+        tensor_like: 8-bit integer vector of size ``num_params`` with non-zero entries at
+        positions indicated by ``indices``, each entry sampled independently from the Rademacher
+        distribution. If ``num_directions`` is provided, a matrix of shape
+        ``(num_directions, num_params)`` with one such vector per row is returned instead.
     """
     # pylint: disable=unused-argument
+    if rng is None and seed is None:
+        rng = np.random
+    elif rng is None:
+        rng = np.random.default_rng(seed)
+    num_rows = 1 if num_directions is None else num_directions
+    num_indices = len(indices)
+    if num_rows * num_indices < _PACKED_BITS_THRESHOLD:
+        bits = (rng.random((num_rows, num_indices)) < 0.5).astype(np.intp)
+    else:
+        # Use one bit of the random bytes per sample and unpack the bits of each row
+        num_bytes = (num_indices + 7) // 8
+        bits = np.frombuffer(rng.bytes(num_rows * num_bytes), dtype=np.uint8)
+        bits = np.unpackbits(bits.reshape((num_rows, num_bytes)), axis=1)[:, :num_indices]
+    directions = np.zeros((num_rows, num_params), dtype=np.int8)
+    directions[:, indices] = _RADEMACHER_SIGNS[bits]
+    return directions[0] if num_directions is None else directions
+
+
+def _sample_directions(sampler, indices, num_params, num_directions, seed, rng=None):
+    """Sample all ``num_directions`` perturbation directions for ``spsa_grad``.
+
+    The default Rademacher sampler is called only once to produce all directions
+    in a single batch. For a fixed ``seed``, it would return the same direction in
+    every call, so a single direction is sampled and repeated instead.
+    Custom samplers are called once per direction, as described in ``spsa_grad``.
+    """
+    if seed is not None and rng is not None:
+        raise ValueError(
+            "Only one of sampler_seed and sampler_rng can be provided, but received "
+            f"sampler_seed={seed} and sampler_rng={rng}."
+        )
+
+    if sampler is not _rademacher_sampler:
+        kwargs = {"seed": seed} if rng is None else {"seed": seed, "rng": rng}
+        return [
+            sampler(indices, num_params, idx_rep, **kwargs) for idx_rep in range(num_directions)
+        ]
+
     if seed is not None:
-        np.random.seed(seed)
-    direction = np.zeros(num_params)
-    direction[indices] = np.random.choice([-1, 1], size=len(indices))
-    return direction
+        return [sampler(indices, num_params, 0, seed=seed)] * num_directions
+
+    return sampler(indices, num_params, rng=rng, num_directions=num_directions)
+
+
+def _merge_directions(directions, indices, coeffs, shifts):
+    """Merge sampled directions that lead to the same shifted tapes.
+
+    Repeated directions share their shifted tapes, and their coefficients are added up. If each
+    shift comes with its negative, as for the ``"center"`` strategy, the shifted tapes of a negated
+    direction are those of the original direction in permuted order. They are reused as well,
+    with correspondingly permuted and negated coefficients.
+
+    Args:
+        directions (Sequence[tensor_like]): Sampled perturbation directions.
+        indices (Sequence[int]): Indices of the trainable tape parameters that are perturbed.
+        coeffs (array): Coefficients of the finite-difference rule. If it contains one more
+            entry than ``shifts``, the first coefficient belongs to the unshifted tape.
+        shifts (array): Non-zero shifts of the finite-difference rule.
+
+    Returns:
+        list[tuple[tensor_like, array]]: The unique directions, each with the coefficients of the
+        finite-difference rule to be used for it.
+    """
+    num_unshifted = len(coeffs) - len(shifts)
+    # Position of the negative of each shift, if all shifts come with their negative
+    negation_perm = [np.flatnonzero(np.isclose(shifts, -shift)) for shift in shifts]
+    if all(len(pos) == 1 for pos in negation_perm):
+        negation_perm = np.concatenate(
+            [np.arange(num_unshifted), num_unshifted + np.ravel(negation_perm)]
+        )
+    else:
+        negation_perm = None
+
+    merged = {}
+    for direction in directions:
+        key = tuple(np.asarray(direction)[indices])
+        neg_key = tuple(-np.asarray(direction)[indices])
+        if key in merged:
+            merged[key][1] = merged[key][1] + coeffs
+        elif negation_perm is not None and neg_key in merged:
+            merged[neg_key][1] = merged[neg_key][1] - coeffs[negation_perm]
+        else:
+            merged[key] = [direction, coeffs]
+
+    return [tuple(entry) for entry in merged.values()]
 
 
 @gradient_transform
@@ -75,6 +171,9 @@ def _spsa_grad_new(
     num_directions=1,
     sampler=_rademacher_sampler,
     sampler_seed=None,
+    sampler_rng=None,
+    broadcast=False,
+    merge_directions=False,
 ):
     r"""Transform a QNode to compute the SPSA gradient of all gate
     parameters with respect to its inputs. This estimator shifts all parameters
@@ -134,12 +233,32 @@ def _spsa_grad_new(
               This argument should be passed to some method that seeds any randomness used in
               the sampler.
 
+            - If ``sampler_rng`` is provided, the keyword argument ``rng``, a
+              ``numpy.random.Generator`` from which any randomness used in the sampler
+              should be drawn.
+
             Note that the circuit evaluations in the various sampled directions are *averaged*,
             not simply summed up.
 
         sampler_seed (int or None): Seed passed to ``sampler``. The seed is passed in each
             call to the sampler, so that only one unique direction is sampled even if
             ``num_directions>1``.
+        sampler_rng (numpy.random.Generator or None): Random number generator passed to
+            ``sampler``. In contrast to ``sampler_seed``, the generator state advances
+            with each sampled direction, so that the directions are reproducible but distinct.
+            Can not be combined with ``sampler_seed``.
+        broadcast (bool): Whether or not to use parameter broadcasting to create
+            a single broadcasted tape for all shifted evaluations instead of one tape per
+            shift and direction. Not supported for tapes with multiple measurements, for
+            shot vectors or for tapes that already are broadcasted. Operations with
+            trainable parameters are required to support broadcasting, which can be checked
+            with the attribute ``qml.ops.qubit.attributes.supports_broadcasting``.
+        merge_directions (bool): Whether or not to create the shifted tapes only once for
+            sampled directions that lead to the same shifted tapes. These are repeated
+            directions and, if each shift comes with its negative as for the ``"center"``
+            strategy, negated directions. Their results are reused with the corresponding
+            coefficients, which does not change the estimate for exact (analytic) evaluations.
+            For finite shots, fewer independent samples are averaged.
 
     Returns:
         function or tuple[list[QuantumTape], function]:
@@ -264,6 +383,23 @@ def _spsa_grad_new(
         Note that the stochastic approximation and the fluctuations from the shot noise
         of the device accumulate, leading to a very coarse-grained estimate for the gradient.
     """
+    if broadcast and len(tape.measurements) > 1:
+        raise NotImplementedError(
+            "Broadcasting with multiple measurements is not supported yet. "
+            f"Set broadcast to False instead. The tape measurements are {tape.measurements}."
+        )
+
+    if broadcast and tape.batch_size is not None:
+        raise NotImplementedError(
+            "Broadcasting with tapes that already are broadcasted is not supported. "
+            f"Set broadcast to False instead. The tape has batch_size={tape.batch_size}."
+        )
+
+    if broadcast and isinstance(shots, Sequence):
+        raise NotImplementedError(
+            "Broadcasting with shot vectors is not supported yet. Set broadcast to False instead."
+        )
+
     if argnum is None and not tape.trainable_params:
         return _no_trainable_grad_new(tape, shots)
 
@@ -300,15 +436,35 @@ def _spsa_grad_new(
 
     tapes_per_grad = len(shifts)
     all_coeffs = []
-    for idx_rep in range(num_directions):
-        direction = sampler(indices, num_trainable_params, idx_rep, seed=sampler_seed)
+    all_shifts = []
+    directions = _sample_directions(
+        sampler, indices, num_trainable_params, num_directions, sampler_seed, sampler_rng
+    )
+    # The scaled shifts and coefficients do not depend on the direction
+    scaled_shifts = h * shifts
+    scaled_coeffs = coeffs / h**n
+    if merge_directions:
+        directions = _merge_directions(directions, indices, scaled_coeffs, shifts)
+    else:
+        directions = [(direction, scaled_coeffs) for direction in directions]
+    for direction, dir_coeffs in directions:
         inv_direction = qml.math.divide(
-            1, direction, where=(direction != 0), out=qml.math.zeros_like(direction)
+            1, direction, where=(direction != 0), out=np.zeros(qml.math.shape(direction))
         )
         # Use only the non-zero part of `direction` for the shifts, to skip redundant zero shifts
-        _shifts = qml.math.tensordot(h * shifts, direction[indices], axes=0)
-        all_coeffs.append(qml.math.tensordot(coeffs / h**n, inv_direction, axes=0))
-        g_tapes = generate_multishifted_tapes(tape, indices, _shifts)
+        _shifts = qml.math.tensordot(scaled_shifts, direction[indices], axes=0)
+        all_coeffs.append(qml.math.tensordot(dir_coeffs, inv_direction, axes=0))
+        if broadcast:
+            all_shifts.append(_shifts)
+        else:
+            g_tapes = generate_multishifted_tapes(tape, indices, _shifts)
+            gradient_tapes.extend(g_tapes)
+
+    if broadcast:
+        # A single tape with the shifts for all directions along the broadcasting dimension
+        g_tapes = generate_multishifted_tapes(
+            tape, indices, qml.math.concatenate(all_shifts), broadcast=True
+        )
         gradient_tapes.extend(g_tapes)
 
     def _single_shot_batch_result(results):
@@ -316,6 +472,9 @@ def _spsa_grad_new(
         shots or a single component of a shot vector"""
 
         r0, results = (results[0], results[1:]) if extract_r0 else (f0, results)
+        if broadcast:
+            # Split the broadcasted result into the results of the individual shifts
+            results = list(qml.math.unstack(results[0]))
         num_measurements = len(tape.measurements)
         if num_measurements == 1:
             grads = 0
@@ -385,6 +544,9 @@ def spsa_grad(
     num_directions=1,
     sampler=_rademacher_sampler,
     sampler_seed=None,
+    sampler_rng=None,
+    broadcast=False,
+    merge_directions=False,
 ):
     r"""Transform a QNode to compute the SPSA gradient of all gate
     parameters with respect to its inputs. This estimator shifts all parameters
@@ -444,9 +606,29 @@ def spsa_grad(
               This argument should be passed to some method that seeds any randomness used in
               the sampler.
 
+            - If ``sampler_rng`` is provided, the keyword argument ``rng``, a
+              ``numpy.random.Generator`` from which any randomness used in the sampler
+              should be drawn.
+
         sampler_seed (int or None): Seed passed to ``sampler``. The seed is passed in each
             call to the sampler, so that only one unique direction is sampled even if
             ``num_directions>1``.
+        sampler_rng (numpy.random.Generator or None): Random number generator passed to
+            ``sampler``. In contrast to ``sampler_seed``, the generator state advances
+            with each sampled direction, so that the directions are reproducible but distinct.
+            Can not be combined with ``sampler_seed``.
+        broadcast (bool): Whether or not to use parameter broadcasting to create
+            a single broadcasted tape for all shifted evaluations instead of one tape per
+            shift and direction. Not supported for tapes with multiple measurements, for
+            shot vectors or for tapes that already are broadcasted. Operations with
+            trainable parameters are required to support broadcasting, which can be checked
+            with the attribute ``qml.ops.qubit.attributes.supports_broadcasting``.
+        merge_directions (bool): Whether or not to create the shifted tapes only once for
+            sampled directions that lead to the same shifted tapes. These are repeated
+            directions and, if each shift comes with its negative as for the ``"center"``
+            strategy, negated directions. Their results are reused with the corresponding
+            coefficients, which does not change the estimate for exact (analytic) evaluations.
+            For finite shots, fewer independent samples are averaged.
 
     Returns:
         function or tuple[list[QuantumTape], function]:
@@ -551,6 +733,21 @@ def spsa_grad(
             num_directions=num_directions,
             sampler=sampler,
             sampler_seed=sampler_seed,
+            sampler_rng=sampler_rng,
+            broadcast=broadcast,
+            merge_directions=merge_directions,
+        )
+
+    if broadcast and len(tape.measurements) > 1:
+        raise NotImplementedError(
+            "Broadcasting with multiple measurements is not supported yet. "
+            f"Set broadcast to False instead. The tape measurements are {tape.measurements}."
+        )
+
+    if broadcast and tape.batch_size is not None:
+        raise NotImplementedError(
+            "Broadcasting with tapes that already are broadcasted is not supported. "
+            f"Set broadcast to False instead. The tape has batch_size={tape.batch_size}."
         )
 
     if argnum is None and not tape.trainable_params:
@@ -594,18 +791,44 @@ def spsa_grad(
 
     tapes_per_grad = len(shifts)
     all_coeffs = []
-    for idx_rep in range(num_directions):
-        direction = sampler(indices, num_trainable_params, idx_rep, seed=sampler_seed)
+    all_shifts = []
+    directions = _sample_directions(
+        sampler, indices, num_trainable_params, num_directions, sampler_seed, sampler_rng
+    )
+    # The scaled shifts and coefficients do not depend on the direction
+    scaled_shifts = h * shifts
+    scaled_coeffs = coeffs / h**n
+    if merge_directions:
+        directions = _merge_directions(directions, indices, scaled_coeffs, shifts)
+    else:
+        directions = [(direction, scaled_coeffs) for direction in directions]
+    for direction, dir_coeffs in directions:
         inv_direction = qml.math.divide(
-            1, direction, where=(direction != 0), out=qml.math.zeros_like(direction)
+            1, direction, where=(direction != 0), out=np.zeros(qml.math.shape(direction))
         )
         # Use only the non-zero part of `direction` for the shifts, to skip redundant zero shifts
-        _shifts = qml.math.tensordot(h * shifts, direction[indices], axes=0)
-        all_coeffs.append(qml.math.tensordot(coeffs / h**n, inv_direction, axes=0))
-        g_tapes = generate_multishifted_tapes(tape, indices, _shifts)
+        _shifts = qml.math.tensordot(scaled_shifts, direction[indices], axes=0)
+        all_coeffs.append(qml.math.tensordot(dir_coeffs, inv_direction, axes=0))
+        if broadcast:
+            all_shifts.append(_shifts)
+        else:
+            g_tapes = generate_multishifted_tapes(tape, indices, _shifts)
+            gradient_tapes.extend(g_tapes)
+
+    if broadcast:
+        # A single tape with the shifts for all directions along the broadcasting dimension
+        g_tapes = generate_multishifted_tapes(
+            tape, indices, qml.math.concatenate(all_shifts), broadcast=True
+        )
         gradient_tapes.extend(g_tapes)
 
     def processing_fn(results):
+        if broadcast:
+            # Split the broadcasted result into the results of the individual shifts. The
+            # broadcasting dimension follows the dimension of the (single) measurement.
+            shifted_res = qml.math.unstack(qml.math.moveaxis(results[-1], 1, 0))
+            results = list(results[:-1]) + list(shifted_res)
+
         # HOTFIX: Apply the same squeezing as in qml.QNode to make the transform output consistent.
         # pylint: disable=protected-access
         if tape._qfunc_output is not None and not isinstance(tape._qfunc_output, Sequence):
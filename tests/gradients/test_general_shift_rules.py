@@ -504,3 +504,28 @@ class TestGenerateMultishiftedTapes:
         assert len(res) == len(shifts)
         for new_tape, exp in zip(res, expected):
             assert new_tape.get_parameters(trainable_only=False) == exp
+
+    def test_with_multiple_pars_broadcast(self):
+        """Test that the function shifts multiple tape parameters as expected
+        when broadcasting is used"""
+
+        with qml.queuing.AnnotatedQueue() as q:
+            qml.PauliZ(0)
+            qml.RX(1, wires=0)
+            qml.CNOT(wires=[0, 2])
+            qml.Rot(2.0, 3.0, 4.0, wires=0)
+            qml.expval(qml.PauliZ(0))
+
+        tape = qml.tape.QuantumScript.from_queue(q)
+        tape.trainable_params = {0, 2, 3}
+        shifts = [[0.1, -0.5], [-0.2, 0.9], [1.6, 0.1]]
+        multipliers = [[0.2, 0.5], [-0.3, 0], [1.0, 1]]
+        res = generate_multishifted_tapes(tape, [0, 2], shifts, multipliers, broadcast=True)
+
+        assert isinstance(res, list)
+        assert len(res) == 1
+        assert res[0].batch_size == len(shifts)
+        new_params = res[0].get_parameters(trainable_only=False)
+        assert np.allclose(new_params[0], [0.2 + 0.1, -0.3 - 0.2, 1.0 + 1.6])
+        assert new_params[1:3] == [2.0, 3.0]
+        assert np.allclose(new_params[3], [0.5 * 4.0 - 0.5, 0.9, 4.0 + 0.1])
@@ -23,17 +23,7 @@ from pennylane.gradients import spsa_grad
 from pennylane.gradients.spsa_gradient import _rademacher_sampler
 from pennylane.devices import DefaultQubit
 from pennylane.operation import Observable, AnyWires
-
-
-def coordinate_sampler(indices, num_params, idx, seed=None):
-    """Return a single canonical basis vector, corresponding
-    to the index ``indices[idx]``. This is a sequential coordinate sampler
-    that allows to exactly reproduce derivatives, instead of using SPSA in the
-    intended way."""
-    idx = idx % len(indices)
-    direction = np.zeros(num_params)
-    direction[indices[idx]] = 1.0
-    return direction
+from spsa_samplers import coordinate_sampler
 
 
 class TestRademacherSampler:
@@ -47,10 +37,45 @@ class TestRademacherSampler:
         for _ in range(5):
             direction = _rademacher_sampler(ids, num)
             assert direction.shape == (num,)
+            assert direction.dtype == np.int8
             assert set(direction).issubset({0, -1, 1})
             assert np.allclose(np.abs(direction)[ids_mask], 1)
             assert np.allclose(direction[~ids_mask], 0)
 
+    @pytest.mark.parametrize(
+        "ids, num",
+        [(list(range(5)), 5), ([0, 2, 4], 5), ([0], 1), ([2, 3], 5), (list(range(0, 999, 2)), 999)],
+    )
+    @pytest.mark.parametrize("num_directions", [1, 7])
+    def test_output_structure_num_directions(self, ids, num, num_directions):
+        """Test that several directions are sampled at once as the rows of a matrix."""
+        ids_mask = np.zeros(num, dtype=bool)
+        ids_mask[ids] = True
+
+        directions = _rademacher_sampler(ids, num, num_directions=num_directions)
+        assert directions.shape == (num_directions, num)
+        assert set(directions.flat).issubset({0, -1, 1})
+        assert np.allclose(np.abs(directions)[:, ids_mask], 1)
+        assert np.allclose(directions[:, ~ids_mask], 0)
+
+    def test_num_directions_with_seed(self):
+        """Test that the first row of a seeded batch matches a single seeded direction."""
+        seed = 12425
+        ids = list(range(20))
+        directions = _rademacher_sampler(ids, 20, seed=seed, num_directions=3)
+        assert np.allclose(directions[0], _rademacher_sampler(ids, 20, seed=seed))
+
+    @pytest.mark.parametrize("num_directions", [1, 3000])
+    def test_mean_and_var_num_directions(self, num_directions):
+        """Test the statistics of a batch of directions, which are drawn from packed
+        random bits for large batches."""
+        ids = list(range(0, 10, 2))
+        directions = _rademacher_sampler(ids, 10, seed=8123, num_directions=num_directions)
+        N = num_directions
+        assert np.allclose(np.mean(directions, axis=0)[ids], 0, atol=4 / np.sqrt(N))
+        assert np.allclose(np.var(directions, axis=0)[ids], 1, atol=4 / N)
+        assert np.allclose(directions[:, 1::2], 0)
+
     def test_call_with_third_arg(self):
         _rademacher_sampler([0, 1, 2], 4, "ignored dummy")
 
@@ -75,6 +100,39 @@ class TestRademacherSampler:
         second_direction = _rademacher_sampler(ids, num, "ignored dummy", seeds[1])
         assert not np.allclose(first_direction, second_direction)
 
+    def test_interleaved_seeds(self):
+        """Test that sampling with another seed in between does not change the
+        direction obtained from a given seed."""
+        ids = list(range(20))
+        first_direction = _rademacher_sampler(ids, 20, seed=42)
+        _rademacher_sampler(ids, 20, seed=43)
+        _rademacher_sampler(ids, 20, seed=42, num_directions=4)
+        assert np.allclose(_rademacher_sampler(ids, 20, seed=42), first_direction)
+
+    @pytest.mark.parametrize("seed", [[1, 2], (1, 2)])
+    def test_sequence_seed(self, seed):
+        """Test that sequences of integers are supported as seeds and yield reproducible
+        directions."""
+        ids = list(range(20))
+        first_direction = _rademacher_sampler(ids, 20, seed=seed)
+        assert np.allclose(_rademacher_sampler(ids, 20, seed=seed), first_direction)
+        assert np.allclose(_rademacher_sampler(ids, 20, seed=[1, 2]), first_direction)
+
+    def test_invalid_seed(self):
+        """Test that the error of the random number generator is raised for invalid seeds."""
+        with pytest.raises(TypeError, match="SeedSequence expects int or sequence of ints"):
+            _rademacher_sampler([0, 1], 2, seed=1.0)
+
+    def test_rng(self):
+        """Test that the sampler draws from a provided generator, which advances its state."""
+        ids = list(range(20))
+        directions = [_rademacher_sampler(ids, 20, rng=np.random.default_rng(42)) for _ in range(2)]
+        assert np.allclose(*directions)
+        rng = np.random.default_rng(42)
+        assert not np.allclose(
+            _rademacher_sampler(ids, 20, rng=rng), _rademacher_sampler(ids, 20, rng=rng)
+        )
+
     @pytest.mark.parametrize(
         "ids, num", [(list(range(5)), 5), ([0, 2, 4], 5), ([0], 1), ([2, 3], 5)]
     )
@@ -148,9 +206,84 @@ class TestSpsaGradient:
         assert len(spy.call_args_list) == num_directions
 
         # Never shift the independent parameter
-        for i in range(num_directions):
-            assert spy.call_args_list[i][0][0:2] == (tape, [0])
-            assert spy.call_args_list[i][0][2].shape == (2, 1)
+        calls = [(c.args[0], c.args[1], c.args[2].shape) for c in spy.call_args_list]
+        assert calls == [(tape, [0], (2, 1))] * num_directions
+
+    @pytest.mark.parametrize("strategy, num_tapes", [("center", 1), ("forward", 2)])
+    def test_broadcast(self, strategy, num_tapes):
+        """Test that broadcasting produces a single tape with all shifts, and
+        that it yields the same Jacobian as the tapes without broadcasting."""
+        with qml.queuing.AnnotatedQueue() as q:
+            qml.RX(0.543, wires=[0])
+            qml.RY(-0.654, wires=[1])
+            qml.CNOT(wires=[0, 1])
+            qml.probs(wires=[0, 1])
+
+        tape = qml.tape.QuantumScript.from_queue(q)
+        dev = qml.device("default.qubit", wires=2)
+        results = []
+        for broadcast in [False, True]:
+            tapes, fn = spsa_grad(
+                tape,
+                strategy=strategy,
+                num_directions=3,
+                broadcast=broadcast,
+                sampler=coordinate_sampler,
+            )
+            results.append(fn(dev.batch_execute(tapes)))
+
+        assert len(tapes) == num_tapes
+        assert tapes[-1].batch_size == 6
+        assert np.allclose(results[0], results[1], atol=1e-10, rtol=0)
+
+    @pytest.mark.parametrize("strategy, num_tapes", [("center", 2), ("forward", 5)])
+    def test_merge_directions(self, strategy, num_tapes):
+        """Test that repeated and, for the "center" strategy, negated directions
+        share their shifted tapes without changing the Jacobian."""
+
+        def sampler(indices, num_params, idx, seed=None):
+            return np.array([1.0, -1.0]) * (-1) ** (idx // 2)
+
+        with qml.queuing.AnnotatedQueue() as q:
+            qml.RX(0.543, wires=[0])
+            qml.RY(-0.654, wires=[1])
+            qml.CNOT(wires=[0, 1])
+            qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
+
+        tape = qml.tape.QuantumScript.from_queue(q)
+        dev = qml.device("default.qubit", wires=2)
+        results = []
+        for merge_directions in [False, True]:
+            tapes, fn = spsa_grad(
+                tape,
+                strategy=strategy,
+                num_directions=4,
+                sampler=sampler,
+                merge_directions=merge_directions,
+            )
+            results.append(fn(dev.batch_execute(tapes)))
+
+        assert len(tapes) == num_tapes
+        assert np.allclose(*results, atol=1e-10, rtol=0)
+
+    def test_broadcast_broadcasted_tape_error(self):
+        """Test that an error is raised when broadcasting a tape that already is broadcasted."""
+        tape = qml.tape.QuantumScript(
+            [qml.RX([0.543, 0.2], wires=[0])], [qml.expval(qml.PauliZ(0))]
+        )
+        with pytest.raises(NotImplementedError, match="tapes that already are broadcasted"):
+            spsa_grad(tape, broadcast=True)
+
+    def test_broadcast_multiple_measurements_error(self):
+        """Test that an error is raised when broadcasting with multiple measurements."""
+        with qml.queuing.AnnotatedQueue() as q:
+            qml.RX(0.543, wires=[0])
+            qml.expval(qml.PauliZ(0))
+            qml.probs(wires=[0])
+
+        tape = qml.tape.QuantumScript.from_queue(q)
+        with pytest.raises(NotImplementedError, match="Broadcasting with multiple measurements"):
+            spsa_grad(tape, broadcast=True)
 
     def test_no_trainable_params_tape(self):
         """Test that the correct ouput and warning is generated in the absence of any trainable
@@ -195,6 +328,8 @@ class TestSpsaGradient:
     def test_no_trainable_params_qnode_torch(self):
         """Test that the correct ouput and warning is generated in the absence of any trainable
         parameters"""
+        pytest.importorskip("torch")
+
         dev = qml.device("default.qubit", wires=2)
 
         @qml.qnode(dev, interface="torch")
@@ -213,6 +348,8 @@ class TestSpsaGradient:
     def test_no_trainable_params_qnode_tf(self):
         """Test that the correct ouput and warning is generated in the absence of any trainable
         parameters"""
+        pytest.importorskip("tensorflow")
+
         dev = qml.device("default.qubit", wires=2)
 
         @qml.qnode(dev, interface="tf")
@@ -231,6 +368,8 @@ class TestSpsaGradient:
     def test_no_trainable_params_qnode_jax(self):
         """Test that the correct ouput and warning is generated in the absence of any trainable
         parameters"""
+        pytest.importorskip("jax")
+
         dev = qml.device("default.qubit", wires=2)
 
         @qml.qnode(dev, interface="jax")
@@ -741,13 +880,10 @@ class TestSpsaGradientDifferentiation:
         np.random.seed(42)
 
         def cost_fn(x):
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(x[0], wires=[0])
-                qml.RY(x[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-            tape = qml.tape.QuantumScript.from_queue(q)
+            tape = qml.tape.QuantumScript(
+                [qml.RX(x[0], wires=[0]), qml.RY(x[1], wires=[1]), qml.CNOT(wires=[0, 1])],
+                [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))],
+            )
             tape.trainable_params = {0, 1}
             tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
             jac = fn(dev.batch_execute(tapes))
@@ -774,14 +910,10 @@ class TestSpsaGradientDifferentiation:
         np.random.seed(42)
 
         def cost_fn(x):
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(x[0], wires=[0])
-                qml.RY(x[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0))
-                qml.probs(wires=[1])
-
-            tape = qml.tape.QuantumScript.from_queue(q)
+            tape = qml.tape.QuantumScript(
+                [qml.RX(x[0], wires=[0]), qml.RY(x[1], wires=[1]), qml.CNOT(wires=[0, 1])],
+                [qml.expval(qml.PauliZ(0)), qml.probs(wires=[1])],
+            )
             tape.trainable_params = {0, 1}
             tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
             jac = fn(dev.batch_execute(tapes))
@@ -806,13 +938,14 @@ class TestSpsaGradientDifferentiation:
         np.random.seed(42)
 
         with tf.GradientTape() as t:
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(params[0], wires=[0])
-                qml.RY(params[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-            tape = qml.tape.QuantumScript.from_queue(q)
+            tape = qml.tape.QuantumScript(
+                [
+                    qml.RX(params[0], wires=[0]),
+                    qml.RY(params[1], wires=[1]),
+                    qml.CNOT(wires=[0, 1]),
+                ],
+                [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))],
+            )
             tape.trainable_params = {0, 1}
             tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
             jac = fn(dev.batch_execute(tapes))
@@ -844,14 +977,14 @@ class TestSpsaGradientDifferentiation:
         np.random.seed(42)
 
         with tf.GradientTape() as t:
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(params[0], wires=[0])
-                qml.RY(params[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0))
-                qml.probs(wires=[1])
-
-            tape = qml.tape.QuantumScript.from_queue(q)
+            tape = qml.tape.QuantumScript(
+                [
+                    qml.RX(params[0], wires=[0]),
+                    qml.RY(params[1], wires=[1]),
+                    qml.CNOT(wires=[0, 1]),
+                ],
+                [qml.expval(qml.PauliZ(0)), qml.probs(wires=[1])],
+            )
             tape.trainable_params = {0, 1}
             tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
             jac = fn(dev.batch_execute(tapes))[1, 0]
@@ -873,13 +1006,10 @@ class TestSpsaGradientDifferentiation:
         params = torch.tensor([0.543, -0.654], dtype=torch.float64, requires_grad=True)
         np.random.seed(42)
 
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(params[0], wires=[0])
-            qml.RY(params[1], wires=[1])
-            qml.CNOT(wires=[0, 1])
-            qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(
+            [qml.RX(params[0], wires=[0]), qml.RY(params[1], wires=[1]), qml.CNOT(wires=[0, 1])],
+            [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))],
+        )
         tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
         jac = fn(dev.batch_execute(tapes))
         if sampler == coordinate_sampler:
@@ -916,13 +1046,10 @@ class TestSpsaGradientDifferentiation:
         np.random.seed(42)
 
         def cost_fn(x):
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(x[0], wires=[0])
-                qml.RY(x[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-            tape = qml.tape.QuantumScript.from_queue(q)
+            tape = qml.tape.QuantumScript(
+                [qml.RX(x[0], wires=[0]), qml.RY(x[1], wires=[1]), qml.CNOT(wires=[0, 1])],
+                [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))],
+            )
             tape.trainable_params = {0, 1}
             tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
             jac = fn(dev.batch_execute(tapes))
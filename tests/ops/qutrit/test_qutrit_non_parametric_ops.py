@@ -16,6 +16,7 @@ Unit tests for the available non-parametric qutrit operations
 """
 import pytest
 import copy
+from functools import lru_cache
 import numpy as np
 from scipy.stats import unitary_group
 
@@ -24,16 +25,79 @@ from pennylane.wires import Wires
 
 from gate_data import OMEGA, TSHIFT, TCLOCK, TADD, TSWAP, TH
 
+
+_INV_SQRT2 = 1.0 / np.sqrt(2.0)
+
+# THadamard matrices acting on two-dimensional subspaces of a qutrit
+_TH_01 = np.ascontiguousarray(
+    np.array([[1, 1, 0], [1, -1, 0], [0, 0, np.sqrt(2)]], dtype=np.complex128) * _INV_SQRT2
+)
+_TH_02 = np.ascontiguousarray(
+    np.array([[1, 0, 1], [0, np.sqrt(2), 0], [1, 0, -1]], dtype=np.complex128) * _INV_SQRT2
+)
+_TH_12 = np.ascontiguousarray(
+    np.array([[np.sqrt(2), 0, 0], [0, 1, 1], [0, 1, -1]], dtype=np.complex128) * _INV_SQRT2
+)
+
+_TH_SUBSPACES = [(0, 1), (0, 2), (1, 2)]
+_TH_SUBSPACE_MATS = dict(zip(_TH_SUBSPACES, [_TH_01, _TH_02, _TH_12]))
+
 NON_PARAMETRIZED_OPERATIONS = [
     (qml.TShift, TSHIFT, None),
     (qml.TClock, TCLOCK, None),
     (qml.TAdd, TADD, None),
     (qml.TSWAP, TSWAP, None),
     (qml.THadamard, TH, None),
-    (qml.THadamard, np.array([[1, 1, 0], [1, -1, 0], [0, 0, np.sqrt(2)]]) / np.sqrt(2), [0, 1]),
-    (qml.THadamard, np.array([[1, 0, 1], [0, np.sqrt(2), 0], [1, 0, -1]]) / np.sqrt(2), [0, 2]),
-    (qml.THadamard, np.array([[np.sqrt(2), 0, 0], [0, 1, 1], [0, 1, -1]]) / np.sqrt(2), [1, 2]),
-]
+] + [(qml.THadamard, _TH_SUBSPACE_MATS[s], list(s)) for s in _TH_SUBSPACES]
+
+
+@lru_cache(maxsize=None)
+def _matrix_for(op_cls, wires, subspace):
+    """Return the matrix of ``op_cls`` acting on ``wires`` (and ``subspace``, if given),
+    memoized so that it is only computed once across all test cases."""
+    op = (
+        op_cls(wires=list(wires))
+        if subspace is None
+        else op_cls(wires=list(wires), subspace=list(subspace))
+    )
+    return np.ascontiguousarray(op.matrix())
+
+
+@lru_cache(maxsize=None)
+def _adj_ref(op_cls, wires, subspace):
+    """Return the conjugate transpose of the matrix returned by ``_matrix_for``, memoized so that
+    it is only computed once across all test cases."""
+    return np.ascontiguousarray(_matrix_for(op_cls, wires, subspace).conj().T)
+
+
+def _cclose(a, b, tol):
+    """Assert that two complex arrays are elementwise equal within ``tol``, comparing their
+    real and imaginary parts as a single flat float array."""
+    a, b = np.asarray(a), np.asarray(b)
+    v = np.concatenate([a.real.ravel(), a.imag.ravel()])
+    w = np.concatenate([b.real.ravel(), b.imag.ravel()])
+    np.testing.assert_allclose(v, w, atol=tol, rtol=0)
+
+
+def _op_key(op_cls, subspace):
+    """Key identifying an entry of ``NON_PARAMETRIZED_OPERATIONS``"""
+    return op_cls, tuple(subspace) if subspace else None
+
+
+@pytest.fixture(scope="module")
+def ops_table():
+    """Operations in ``NON_PARAMETRIZED_OPERATIONS`` constructed once for the whole module,
+    together with their expected matrices."""
+    return {
+        _op_key(op_cls, subspace): (
+            op_cls(wires=range(op_cls.num_wires))
+            if subspace is None
+            else op_cls(wires=range(op_cls.num_wires), subspace=subspace),
+            mat,
+        )
+        for op_cls, mat, subspace in NON_PARAMETRIZED_OPERATIONS
+    }
+
 
 subspace_error_data = [
     ([1, 1], "Elements of subspace list must be unique."),
@@ -50,34 +114,28 @@ subspace_error_data = [
 
 class TestOperations:
     @pytest.mark.parametrize("op_cls, mat, subspace", NON_PARAMETRIZED_OPERATIONS)
-    def test_nonparametrized_op_copy(self, op_cls, mat, subspace, tol):
+    def test_nonparametrized_op_copy(self, op_cls, mat, subspace, ops_table, tol):
         """Tests that copied nonparametrized ops function as expected"""
-        op = (
-            op_cls(wires=range(op_cls.num_wires))
-            if subspace is None
-            else op_cls(wires=range(op_cls.num_wires), subspace=subspace)
-        )
-        copied_op = copy.copy(op)
-        np.testing.assert_allclose(op.matrix(), copied_op.matrix(), atol=tol)
+        key = _op_key(op_cls, subspace)
+        ref_args = (op_cls, tuple(range(op_cls.num_wires)), key[1])
+
+        # copy the shared op, since it is mutated below
+        op = copy.copy(ops_table[key][0])
+        _cclose(copy.copy(op).matrix(), _matrix_for(*ref_args), tol)
 
         op._inverse = True
-        copied_op2 = copy.copy(op)
-        np.testing.assert_allclose(op.matrix(), copied_op2.matrix(), atol=tol)
+        _cclose(copy.copy(op).matrix(), _adj_ref(*ref_args), tol)
 
     @pytest.mark.parametrize("ops, mat, subspace", NON_PARAMETRIZED_OPERATIONS)
-    def test_matrices(self, ops, mat, subspace, tol):
+    def test_matrices(self, ops, mat, subspace, ops_table, tol):
         """Test matrices of non-parametrized operations are correct"""
-        op = (
-            ops(wires=range(ops.num_wires))
-            if subspace is None
-            else ops(wires=range(ops.num_wires), subspace=subspace)
-        )
+        op = ops_table[_op_key(ops, subspace)][0]
         res_static = (
             op.compute_matrix() if subspace is None else op.compute_matrix(subspace=subspace)
         )
         res_dynamic = op.matrix()
-        assert np.allclose(res_static, mat, atol=tol, rtol=0)
-        assert np.allclose(res_dynamic, mat, atol=tol, rtol=0)
+        _cclose(res_static, mat, tol)
+        _cclose(res_dynamic, mat, tol)
 
     @pytest.mark.parametrize("subspace, err_msg", subspace_error_data)
     @pytest.mark.parametrize("op_cls", [qml.THadamard])
@@ -92,84 +150,127 @@ class TestOperations:
             op_cls.compute_matrix(subspace=subspace)
 
 
+CUBE_ROOTS = np.exp(2j * np.pi * np.arange(3) / 3)
+
+
+def _sorted_spectrum(eigvals):
+    """Sort eigenvalues so that spectra can be compared regardless of ordering. Values are
+    rounded first so that floating point noise cannot change the order."""
+    return np.sort_complex(np.round(eigvals, 10))
+
+
+def _permutation_spectrum(mat):
+    """Eigenvalues of a permutation matrix, obtained from its cycle structure: each cycle of
+    length ``L`` contributes the ``L``-th roots of unity."""
+    perm = np.argmax(np.real(mat), axis=0)
+    visited = set()
+    roots = []
+
+    for start in range(len(perm)):
+        if start in visited:
+            continue
+
+        length, idx = 0, start
+        while idx not in visited:
+            visited.add(idx)
+            idx = perm[idx]
+            length += 1
+
+        roots.extend(np.exp(2j * np.pi * np.arange(length) / length))
+
+    return np.array(roots)
+
+
 class TestEigenval:
     def test_tshift_eigenval(self):
-        """Tests that the TShift eigenvalue matches the numpy eigenvalues of the TShift matrix"""
+        """Tests that the TShift eigenvalues are the cube roots of unity"""
         op = qml.TShift(wires=0)
-        exp = np.linalg.eigvals(op.matrix())
+        exp = CUBE_ROOTS
         res = op.eigvals()
-        assert np.allclose(res, exp)
+        assert np.allclose(_sorted_spectrum(res), _sorted_spectrum(exp))
 
     def test_tclock_eigenval(self):
-        """Tests that the TClock eigenvalue matches the numpy eigenvalues of the TClock matrix"""
+        """Tests that the TClock eigenvalues are the cube roots of unity"""
         op = qml.TClock(wires=0)
-        exp = np.linalg.eigvals(op.matrix())
+        exp = CUBE_ROOTS
         res = op.eigvals()
-        assert np.allclose(res, exp)
+        assert np.allclose(_sorted_spectrum(res), _sorted_spectrum(exp))
 
     def test_tadd_eigenval(self):
-        """Tests that the TAdd eigenvalue matches the numpy eigenvalues of the TAdd matrix"""
+        """Tests that the TAdd eigenvalues match the spectrum of a controlled TShift"""
         op = qml.TAdd(wires=[0, 1])
-        exp = np.linalg.eigvals(op.matrix())
+        # the target is unchanged when the control is in |0>, and shifted once or twice
+        # otherwise, each of which has the cube roots of unity as its spectrum
+        exp = np.concatenate([np.ones(3), CUBE_ROOTS, CUBE_ROOTS])
         res = op.eigvals()
-        assert np.allclose(res, exp)
+        assert np.allclose(_sorted_spectrum(res), _sorted_spectrum(exp))
 
     def test_tswap_eigenval(self):
-        """Tests that the TSWAP eigenvalue matches the numpy eigenvalues of the TSWAP matrix"""
+        """Tests that the TSWAP eigenvalues match the spectrum of the TSWAP permutation"""
         op = qml.TSWAP(wires=[0, 1])
-        exp = np.linalg.eigvals(op.matrix())
+        exp = _permutation_spectrum(_matrix_for(qml.TSWAP, (0, 1), None))
         res = op.eigvals()
-        assert np.allclose(res, exp)
+        assert np.allclose(_sorted_spectrum(res), _sorted_spectrum(exp))
 
 
+# Operations are described by ``(op_cls, kwargs)`` specs and only constructed, by the ``op``
+# fixture, once a test using them runs, rather than when this module is imported.
 period_three_ops = [
-    qml.TShift(wires=0),
-    qml.TClock(wires=0),
-    qml.TAdd(wires=[0, 1]),
+    (qml.TShift, {"wires": 0}),
+    (qml.TClock, {"wires": 0}),
+    (qml.TAdd, {"wires": [0, 1]}),
 ]
 
-period_two_ops = [
-    qml.TSWAP(wires=[0, 1]),
-    qml.THadamard(wires=0, subspace=[0, 1]),
-    qml.THadamard(wires=0, subspace=[0, 2]),
-    qml.THadamard(wires=0, subspace=[1, 2]),
-]
+# THadamard on each two-dimensional subspace, shared by the tables below
+_th_subspace_ops = [(qml.THadamard, {"wires": 0, "subspace": list(s)}) for s in _TH_SUBSPACES]
+
+period_two_ops = [(qml.TSWAP, {"wires": [0, 1]})] + _th_subspace_ops
 
 no_pow_method_ops = [
-    qml.THadamard(wires=0, subspace=None),
+    (qml.THadamard, {"wires": 0, "subspace": None}),
 ]
 
 
+@pytest.fixture
+def op(request):
+    """Construct the operation described by the ``(op_cls, kwargs)`` spec passed through
+    indirect parametrization"""
+    op_cls, kwargs = request.param
+    return op_cls(**kwargs)
+
+
 class TestPowMethod:
-    @pytest.mark.parametrize("op", period_three_ops)
-    @pytest.mark.parametrize("offset", (-6, -3, 0, 3, 6))
-    def test_period_three_pow(self, op, offset):
+    @pytest.mark.parametrize("op", period_three_ops, indirect=True)
+    def test_period_three_pow(self, op):
         """Tests that ops with period == 3 behave correctly when raised to various
         integer powers"""
-
-        # When raising to power == 0 mod 3
-        assert len(op.pow(0 + offset)) == 0
-
-        # When raising to power == 1 mod 3
-        op_pow_1 = op.pow(1 + offset)[0]
-        assert op_pow_1.__class__ is op.__class__
-        assert np.allclose(op_pow_1.matrix(), op.matrix())
-        assert op_pow_1.inverse == False
-
-        # When raising to power == 2 mod 3
-        op_pow_2 = op.pow(2 + offset)[0]
-        assert op_pow_2.__class__ is op.__class__
-        assert np.allclose(op.matrix().conj().T, op_pow_2.matrix())
-        assert op_pow_2.inverse == True
-
-    @pytest.mark.parametrize("op", period_three_ops + period_two_ops)
+        mat = _matrix_for(type(op), tuple(op.wires), None)
+        adj_mat = _adj_ref(type(op), tuple(op.wires), None)
+
+        for offset in (-6, -3, 0, 3, 6):
+            # When raising to power == 0 mod 3
+            assert len(op.pow(0 + offset)) == 0
+
+            # When raising to power == 1 mod 3
+            op_pow_1 = op.pow(1 + offset)[0]
+            assert op_pow_1.__class__ is op.__class__
+            assert np.allclose(op_pow_1.matrix(), mat)
+            assert op_pow_1.inverse == False
+
+            # When raising to power == 2 mod 3
+            op_pow_2 = op.pow(2 + offset)[0]
+            assert op_pow_2.__class__ is op.__class__
+            assert np.allclose(adj_mat, op_pow_2.matrix())
+            assert op_pow_2.inverse == True
+
+    @pytest.mark.parametrize("op", period_three_ops + period_two_ops, indirect=True)
     def test_period_two_three_noninteger_power(self, op):
         """Test that ops with a period of 2 or 3 raised to a non-integer power raise an error"""
         with pytest.raises(qml.operation.PowUndefinedError):
             op.pow(1.234)
 
     @pytest.mark.parametrize("offset", [0, 2, -2, 4, -4])
-    @pytest.mark.parametrize("op", period_two_ops)
+    @pytest.mark.parametrize("op", period_two_ops, indirect=True)
     def test_period_two_pow(self, offset, op):
         """Tests that ops with period == 2 behave correctly when raised to various
         integer powers"""
@@ -177,7 +278,7 @@ class TestPowMethod:
         assert len(op.pow(0 + offset)) == 0
         assert op.pow(1 + offset)[0].__class__ is op.__class__
 
-    @pytest.mark.parametrize("op", no_pow_method_ops)
+    @pytest.mark.parametrize("op", no_pow_method_ops, indirect=True)
     def test_no_pow_ops(self, op):
         assert len(op.pow(0)) == 0
 
@@ -193,17 +294,19 @@ class TestPowMethod:
 
 
 label_data = [
-    (qml.TShift(0), "TShift", "TShift⁻¹"),
-    (qml.TClock(0), "TClock", "TClock⁻¹"),
-    (qml.TAdd([0, 1]), "TAdd", "TAdd⁻¹"),
-    (qml.TSWAP([0, 1]), "TSWAP", "TSWAP"),
-    (qml.THadamard(0), "TH", "TH⁻¹"),
-    (qml.THadamard(0, subspace=[0, 1]), "TH", "TH"),
+    (qml.TShift, {"wires": 0}, "TShift", "TShift⁻¹"),
+    (qml.TClock, {"wires": 0}, "TClock", "TClock⁻¹"),
+    (qml.TAdd, {"wires": [0, 1]}, "TAdd", "TAdd⁻¹"),
+    (qml.TSWAP, {"wires": [0, 1]}, "TSWAP", "TSWAP"),
+    (qml.THadamard, {"wires": 0}, "TH", "TH⁻¹"),
+    (qml.THadamard, {"wires": 0, "subspace": [0, 1]}, "TH", "TH"),
 ]
 
 
-@pytest.mark.parametrize("op, label1, label2", label_data)
-def test_label_method(op, label1, label2):
+@pytest.mark.parametrize("op_cls, kwargs, label1, label2", label_data)
+def test_label_method(op_cls, kwargs, label1, label2):
+    # construct a fresh op, since it is inverted in-place below
+    op = op_cls(**kwargs)
     assert op.label() == label1
     assert op.label(decimals=2) == label1
 
@@ -228,33 +331,30 @@ def test_control_wires(op, control_wires):
 
 
 adjoint_ops = [  # ops that are not their own inverses
-    qml.TShift(wires=0),
-    qml.TClock(wires=0),
-    qml.TAdd(wires=[0, 1]),
-    qml.THadamard(wires=0, subspace=None),
+    (qml.TShift, {"wires": 0}),
+    (qml.TClock, {"wires": 0}),
+    (qml.TAdd, {"wires": [0, 1]}),
+    (qml.THadamard, {"wires": 0, "subspace": None}),
 ]
 
-involution_ops = [  # ops that are their own inverses
-    qml.TSWAP(wires=[0, 1]),
-    qml.THadamard(wires=0, subspace=[0, 1]),
-    qml.THadamard(wires=0, subspace=[0, 2]),
-    qml.THadamard(wires=0, subspace=[1, 2]),
-]
+involution_ops = period_two_ops[:]  # ops that are their own inverses
 
 
-@pytest.mark.parametrize("op", adjoint_ops)
-def test_adjoint_method(op, tol):
+@pytest.mark.parametrize("op", adjoint_ops, indirect=True)
+def test_adjoint_method(op):
     adj_op = copy.copy(op)
     adj_op = adj_op.adjoint()
 
     assert adj_op.name == op.name + ".inv"
-    assert np.allclose(adj_op.matrix(), op.matrix().conj().T)
+    adj_mat = _adj_ref(type(op), tuple(op.wires), getattr(op, "subspace", None))
+    assert np.allclose(adj_op.matrix(), adj_mat)
 
 
-@pytest.mark.parametrize("op", involution_ops)
-def test_adjoint_method_involution(op, tol):
+@pytest.mark.parametrize("op", involution_ops, indirect=True)
+def test_adjoint_method_involution(op):
     adj_op = copy.copy(op)
     adj_op = adj_op.adjoint()
 
     assert adj_op.name == op.name
-    assert np.allclose(adj_op.matrix(), op.matrix())
+    mat = _matrix_for(type(op), tuple(op.wires), getattr(op, "subspace", None))
+    assert np.allclose(adj_op.matrix(), mat)
@@ -23,35 +23,97 @@ from pennylane.devices import DefaultQubit
 from pennylane.gradients import spsa_grad
 from pennylane.gradients.spsa_gradient import _rademacher_sampler
 from pennylane.operation import AnyWires, Observable
+from spsa_samplers import coordinate_sampler
 
 
-def coordinate_sampler(indices, num_params, idx, seed=None):
-    """Return a single canonical basis vector, corresponding
-    to the index ``indices[idx]``. This is a sequential coordinate sampler
-    that allows to exactly reproduce derivatives, instead of using SPSA in the
-    intended way."""
-    idx = idx % len(indices)
-    direction = np.zeros(num_params)
-    direction[indices[idx]] = 1.0
-    return direction
+# Parameters of the circuit in ``base_ops`` and trigonometric values used in the expected results
+_X, _Y = 0.543, -0.654
+_SIN_X, _COS_X, _SIN_Y, _COS_Y = numpy.sin(_X), numpy.cos(_X), numpy.sin(_Y), numpy.cos(_Y)
+_EXPECTED_SINGLE = numpy.array([[-_SIN_Y * _SIN_X, _COS_Y * _COS_X]])
+# Second derivatives of <Z0 X1> and derivatives of the x-derivative of the probabilities of wire 1
+_EXPECTED_HESSIAN = numpy.array(
+    [[-_COS_X * _SIN_Y, -_COS_Y * _SIN_X], [-_COS_Y * _SIN_X, -_COS_X * _SIN_Y]]
+)
+_EXPECTED_HESSIAN_RAGGED = numpy.array(
+    [[-_COS_X * _COS_Y / 2, _SIN_X * _SIN_Y / 2], [_COS_X * _COS_Y / 2, -_SIN_X * _SIN_Y / 2]]
+)
+
+
+def _close(a, b, atol):
+    """Check that ``a`` and ``b`` agree entry-wise up to the absolute tolerance ``atol``.
+    This is equivalent to ``np.allclose(a, b, atol=atol, rtol=0)``."""
+    diff = numpy.abs(numpy.asarray(a) - numpy.asarray(b))
+    return diff <= atol if diff.ndim == 0 else diff.max() <= atol
+
+
+@pytest.fixture(scope="module")
+def dev2():
+    return qml.device("default.qubit", wires=2)
+
+
+@pytest.fixture(scope="module")
+def dev3():
+    return qml.device("default.qubit", wires=3)
+
+
+@pytest.fixture(scope="module")
+def dev4():
+    return qml.device("default.qubit", wires=4)
+
+
+@pytest.fixture(scope="module")
+def base_ops():
+    """Operations of the two-qubit circuit shared by the SPSA integration tests."""
+    return [qml.RX(_X, wires=[0]), qml.RY(_Y, wires=[1]), qml.CNOT(wires=[0, 1])]
+
+
+@pytest.fixture(scope="class")
+def cached_batch_execute():
+    """Function executing tapes on a device, which reuses the results of identical tapes that
+    were already executed on an equivalent device within the same test class. This is valid
+    for the analytic ``default.qubit`` devices used here, which produce deterministic results.
+    The stored results are discarded once the test class is finished.
+
+    As ``tape.hash`` rounds the parameters, the exact parameter values are part of the key
+    as well, so that tapes with nearby shifted parameters are never mixed up."""
+    cache = {}
+
+    def _key(dev, tape):
+        params = qml.math.unwrap(tape.get_parameters(trainable_only=False))
+        params = tuple(numpy.asarray(p).tobytes() for p in params)
+        return (dev.short_name, dev.num_wires, dev.shots, tape.hash, params)
+
+    def batch_execute(dev, tapes):
+        keys = [_key(dev, tape) for tape in tapes]
+        missing = {key: tape for key, tape in zip(keys, tapes) if key not in cache}
+        if missing:
+            cache.update(zip(missing, dev.batch_execute(list(missing.values()))))
+        return [cache[key] for key in keys]
+
+    yield batch_execute
+    cache.clear()
+
+
+def _scale(jac, factor):
+    """Scale all entries of a Jacobian, which may be a nested tuple of tensors, by ``factor``."""
+    if isinstance(jac, tuple):
+        return tuple(_scale(j, factor) for j in jac)
+    return factor * jac
 
 
 class TestSpsaGradient:
     """Tests for the SPSA gradient transform"""
 
-    def test_non_differentiable_error(self):
+    def test_non_differentiable_error(self, dev2):
         """Test error raised if attempting to differentiate with
         respect to a non-differentiable argument"""
         psi = np.array([1, 0, 1, 0], requires_grad=False) / np.sqrt(2)
 
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.QubitStateVector(psi, wires=[0, 1])
-            qml.RX(0.543, wires=[0])
-            qml.RY(-0.654, wires=[1])
-            qml.CNOT(wires=[0, 1])
-            qml.probs(wires=[0, 1])
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(
+            [qml.RX(0.543, wires=[0]), qml.RY(-0.654, wires=[1]), qml.CNOT(wires=[0, 1])],
+            [qml.probs(wires=[0, 1])],
+            prep=[qml.QubitStateVector(psi, wires=[0, 1])],
+        )
         # by default all parameters are assumed to be trainable
         with pytest.raises(
             ValueError, match=r"Cannot differentiate with respect to parameter\(s\) {0}"
@@ -60,10 +122,9 @@ class TestSpsaGradient:
 
         # setting trainable parameters avoids this
         tape.trainable_params = {1, 2}
-        dev = qml.device("default.qubit", wires=2)
         tapes, fn = spsa_grad(tape)
 
-        res = fn(dev.batch_execute(tapes))
+        res = fn(dev2.batch_execute(tapes))
         assert isinstance(res, tuple)
 
         assert isinstance(res[0], numpy.ndarray)
@@ -73,20 +134,16 @@ class TestSpsaGradient:
         assert res[1].shape == (4,)
 
     @pytest.mark.parametrize("num_directions", [1, 10])
-    def test_independent_parameter(self, num_directions, mocker):
+    def test_independent_parameter(self, dev2, num_directions, mocker):
         """Test that an independent parameter is skipped
         during the Jacobian computation."""
         spy = mocker.spy(qml.gradients.spsa_gradient, "generate_multishifted_tapes")
 
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(0.543, wires=[0])
-            qml.RY(-0.654, wires=[1])
-            qml.expval(qml.PauliZ(0))
-
-        tape = qml.tape.QuantumScript.from_queue(q)
-        dev = qml.device("default.qubit", wires=2)
+        tape = qml.tape.QuantumScript(
+            [qml.RX(0.543, wires=[0]), qml.RY(-0.654, wires=[1])], [qml.expval(qml.PauliZ(0))]
+        )
         tapes, fn = spsa_grad(tape, num_directions=num_directions)
-        res = fn(dev.batch_execute(tapes))
+        res = fn(dev2.batch_execute(tapes))
 
         assert isinstance(res, tuple)
         assert len(res) == 2
@@ -98,49 +155,151 @@ class TestSpsaGradient:
         assert len(spy.call_args_list) == num_directions
 
         # Never shift the independent parameter
-        for i in range(num_directions):
-            assert spy.call_args_list[i][0][0:2] == (tape, [0])
-            assert spy.call_args_list[i][0][2].shape == (2, 1)
+        calls = [(c.args[0], c.args[1], c.args[2].shape) for c in spy.call_args_list]
+        assert calls == [(tape, [0], (2, 1))] * num_directions
+
+    @pytest.mark.parametrize("num_directions", [1, 10])
+    @pytest.mark.parametrize("strategy, num_tapes", [("center", 1), ("forward", 2)])
+    @pytest.mark.parametrize(
+        "measurement", [qml.expval(qml.PauliZ(0) @ qml.PauliX(1)), qml.probs(wires=[0, 1])]
+    )
+    def test_broadcast(self, dev2, base_ops, num_directions, strategy, num_tapes, measurement):
+        """Test that broadcasting produces a single tape with all shifts, and
+        that it yields the same Jacobian as the tapes without broadcasting."""
+        tape = qml.tape.QuantumScript(base_ops, [measurement])
+
+        results = []
+        for broadcast in [False, True]:
+            tapes, fn = spsa_grad(
+                tape,
+                strategy=strategy,
+                num_directions=num_directions,
+                broadcast=broadcast,
+                sampler=coordinate_sampler,
+            )
+            results.append(fn(dev2.batch_execute(tapes)))
+
+        # An unshifted tape is only needed for the "forward" strategy. For the default
+        # approximation order, both strategies use two shifted evaluations per direction.
+        assert len(tapes) == num_tapes
+        assert tapes[-1].batch_size == 2 * num_directions
+        assert all(_close(r, r_bc, atol=1e-10) for r, r_bc in zip(*results))
+
+    def test_sampler_rng(self, dev2, base_ops):
+        """Test that the directions are drawn from the provided generator, such that
+        generators with the same seed yield the same Jacobian."""
+        tape = qml.tape.QuantumScript(base_ops, [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))])
+        rng = np.random.default_rng(42)
+        tapes_0, _ = spsa_grad(tape, num_directions=3, sampler_rng=np.random.default_rng(42))
+        tapes_1, _ = spsa_grad(tape, num_directions=3, sampler_rng=rng)
+        tapes_2, _ = spsa_grad(tape, num_directions=3, sampler_rng=rng)
+
+        params = [[t.get_parameters() for t in tapes] for tapes in (tapes_0, tapes_1, tapes_2)]
+        assert np.allclose(params[0], params[1])
+        assert not np.allclose(params[1], params[2])
+
+    @pytest.mark.parametrize("sampler_seed", [[1, 2], numpy.array([1, 2])])
+    def test_sequence_sampler_seed(self, base_ops, sampler_seed):
+        """Test that sequences of integers can be used as sampler seed."""
+        tape = qml.tape.QuantumScript(base_ops, [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))])
+        tapes_0, _ = spsa_grad(tape, num_directions=2, sampler_seed=sampler_seed)
+        tapes_1, _ = spsa_grad(tape, num_directions=2, sampler_seed=(1, 2))
+
+        params = [[t.get_parameters() for t in tapes] for tapes in (tapes_0, tapes_1)]
+        assert np.allclose(params[0], params[1])
+
+    @pytest.mark.parametrize(
+        "strategy, approx_order, n, num_tapes",
+        [("center", 2, 1, 2), ("center", 4, 1, 4), ("center", 2, 2, 3), ("forward", 2, 1, 5)],
+    )
+    def test_merge_directions(self, dev2, base_ops, strategy, approx_order, n, num_tapes):
+        """Test that repeated and, for shifts that come with their negatives, negated
+        directions share their shifted tapes without changing the Jacobian."""
+
+        def sampler(indices, num_params, idx, seed=None):
+            return numpy.array([1.0, -1.0]) * (-1) ** (idx // 2)
+
+        tape = qml.tape.QuantumScript(base_ops, [qml.expval(qml.PauliZ(0)), qml.probs(wires=[1])])
+        results = []
+        for merge_directions in [False, True]:
+            tapes, fn = spsa_grad(
+                tape,
+                strategy=strategy,
+                approx_order=approx_order,
+                n=n,
+                h=0.1,
+                num_directions=4,
+                sampler=sampler,
+                merge_directions=merge_directions,
+            )
+            results.append(fn(dev2.batch_execute(tapes)))
+
+        # The four directions are merged into one, or into two for the "forward" strategy,
+        # where only repeated but not negated directions are merged
+        assert len(tapes) == num_tapes
+        for res, res_merged in zip(*results):
+            assert all(_close(r, r_merged, atol=1e-10) for r, r_merged in zip(res, res_merged))
+
+    def test_sampler_rng_and_seed_error(self):
+        """Test that an error is raised if both a sampler seed and generator are provided."""
+        tape = qml.tape.QuantumScript([qml.RX(0.543, wires=[0])], [qml.expval(qml.PauliZ(0))])
+        with pytest.raises(ValueError, match="Only one of sampler_seed and sampler_rng"):
+            spsa_grad(tape, sampler_seed=42, sampler_rng=np.random.default_rng(42))
+
+    def test_broadcast_multiple_measurements_error(self):
+        """Test that an error is raised when broadcasting with multiple measurements."""
+        tape = qml.tape.QuantumScript(
+            [qml.RX(0.543, wires=[0])], [qml.expval(qml.PauliZ(0)), qml.probs(wires=[0])]
+        )
+        with pytest.raises(NotImplementedError, match="Broadcasting with multiple measurements"):
+            spsa_grad(tape, broadcast=True)
+
+    def test_broadcast_broadcasted_tape_error(self):
+        """Test that an error is raised when broadcasting a tape that already is broadcasted."""
+        tape = qml.tape.QuantumScript(
+            [qml.RX([0.543, 0.2], wires=[0])], [qml.expval(qml.PauliZ(0))]
+        )
+        with pytest.raises(NotImplementedError, match="tapes that already are broadcasted"):
+            spsa_grad(tape, broadcast=True)
+
+    def test_broadcast_shot_vector_error(self):
+        """Test that an error is raised when broadcasting with a shot vector."""
+        tape = qml.tape.QuantumScript([qml.RX(0.543, wires=[0])], [qml.expval(qml.PauliZ(0))])
+        with pytest.raises(NotImplementedError, match="Broadcasting with shot vectors"):
+            spsa_grad(tape, broadcast=True, shots=[10, 100])
 
-    def test_no_trainable_params_tape(self):
+    def test_no_trainable_params_tape(self, dev2):
         """Test that the correct ouput and warning is generated in the absence of any trainable
         parameters"""
-        dev = qml.device("default.qubit", wires=2)
 
         weights = [0.1, 0.2]
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(weights[0], wires=0)
-            qml.RY(weights[1], wires=0)
-            qml.expval(qml.PauliZ(0) @ qml.PauliZ(1))
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(
+            [qml.RX(weights[0], wires=0), qml.RY(weights[1], wires=0)],
+            [qml.expval(qml.PauliZ(0) @ qml.PauliZ(1))],
+        )
         # TODO: remove once #2155 is resolved
         tape.trainable_params = []
         with pytest.warns(UserWarning, match="gradient of a tape with no trainable parameters"):
             g_tapes, post_processing = spsa_grad(tape)
-        res = post_processing(qml.execute(g_tapes, dev, None))
+        res = post_processing(qml.execute(g_tapes, dev2, None))
 
         assert g_tapes == []
         assert isinstance(res, numpy.ndarray)
         assert res.shape == (0,)
 
-    def test_no_trainable_params_multiple_return_tape(self):
+    def test_no_trainable_params_multiple_return_tape(self, dev2):
         """Test that the correct ouput and warning is generated in the absence of any trainable
         parameters with multiple returns."""
-        dev = qml.device("default.qubit", wires=2)
 
         weights = [0.1, 0.2]
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(weights[0], wires=0)
-            qml.RY(weights[1], wires=0)
-            qml.expval(qml.PauliZ(0) @ qml.PauliZ(1))
-            qml.probs(wires=[0, 1])
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(
+            [qml.RX(weights[0], wires=0), qml.RY(weights[1], wires=0)],
+            [qml.expval(qml.PauliZ(0) @ qml.PauliZ(1)), qml.probs(wires=[0, 1])],
+        )
         tape.trainable_params = []
         with pytest.warns(UserWarning, match="gradient of a tape with no trainable parameters"):
             g_tapes, post_processing = spsa_grad(tape)
-        res = post_processing(qml.execute(g_tapes, dev, None))
+        res = post_processing(qml.execute(g_tapes, dev2, None))
 
         assert g_tapes == []
         assert isinstance(res, tuple)
@@ -148,67 +307,21 @@ class TestSpsaGradient:
         assert res[0].shape == (0,)
         assert res[1].shape == (0,)
 
-    @pytest.mark.autograd
-    def test_no_trainable_params_qnode_autograd(self):
-        """Test that the correct ouput and warning is generated in the absence of any trainable
-        parameters"""
-        dev = qml.device("default.qubit", wires=2)
-
-        @qml.qnode(dev, interface="autograd")
-        def circuit(weights):
-            qml.RX(weights[0], wires=0)
-            qml.RY(weights[1], wires=0)
-            return qml.expval(qml.PauliZ(0) @ qml.PauliZ(1))
-
-        weights = [0.1, 0.2]
-        with pytest.warns(UserWarning, match="gradient of a QNode with no trainable parameters"):
-            res = spsa_grad(circuit)(weights)
-
-        assert res == ()
-
-    @pytest.mark.torch
-    def test_no_trainable_params_qnode_torch(self):
-        """Test that the correct ouput and warning is generated in the absence of any trainable
-        parameters"""
-        dev = qml.device("default.qubit", wires=2)
-
-        @qml.qnode(dev, interface="torch")
-        def circuit(weights):
-            qml.RX(weights[0], wires=0)
-            qml.RY(weights[1], wires=0)
-            return qml.expval(qml.PauliZ(0) @ qml.PauliZ(1))
-
-        weights = [0.1, 0.2]
-        with pytest.warns(UserWarning, match="gradient of a QNode with no trainable parameters"):
-            res = spsa_grad(circuit)(weights)
-
-        assert res == ()
-
-    @pytest.mark.tf
-    def test_no_trainable_params_qnode_tf(self):
-        """Test that the correct ouput and warning is generated in the absence of any trainable
-        parameters"""
-        dev = qml.device("default.qubit", wires=2)
-
-        @qml.qnode(dev, interface="tf")
-        def circuit(weights):
-            qml.RX(weights[0], wires=0)
-            qml.RY(weights[1], wires=0)
-            return qml.expval(qml.PauliZ(0) @ qml.PauliZ(1))
-
-        weights = [0.1, 0.2]
-        with pytest.warns(UserWarning, match="gradient of a QNode with no trainable parameters"):
-            res = spsa_grad(circuit)(weights)
-
-        assert res == ()
-
-    @pytest.mark.jax
-    def test_no_trainable_params_qnode_jax(self):
+    @pytest.mark.parametrize(
+        "interface, module",
+        [
+            pytest.param("autograd", "autograd", marks=pytest.mark.autograd),
+            pytest.param("torch", "torch", marks=pytest.mark.torch),
+            pytest.param("tf", "tensorflow", marks=pytest.mark.tf),
+            pytest.param("jax", "jax", marks=pytest.mark.jax),
+        ],
+    )
+    def test_no_trainable_params_qnode(self, dev2, interface, module):
         """Test that the correct ouput and warning is generated in the absence of any trainable
         parameters"""
-        dev = qml.device("default.qubit", wires=2)
+        pytest.importorskip(module)
 
-        @qml.qnode(dev, interface="jax")
+        @qml.qnode(dev2, interface=interface)
         def circuit(weights):
             qml.RX(weights[0], wires=0)
             qml.RY(weights[1], wires=0)
@@ -220,87 +333,41 @@ class TestSpsaGradient:
 
         assert res == ()
 
-    def test_all_zero_diff_methods(self):
+    @pytest.mark.parametrize("return_type", ["probs", ("expval", "probs")])
+    def test_all_zero_diff_methods(self, dev4, return_type):
         """Test that the transform works correctly when the diff method for every parameter is
-        identified to be 0, and that no tapes were generated."""
-        dev = qml.device("default.qubit", wires=4)
-
-        @qml.qnode(dev)
-        def circuit(params):
-            qml.Rot(*params, wires=0)
-            return qml.probs([2, 3])
-
-        params = np.array([0.5, 0.5, 0.5], requires_grad=True)
-
-        result = spsa_grad(circuit)(params)
-
-        assert isinstance(result, tuple)
-
-        assert len(result) == 3
-
-        assert isinstance(result[0], numpy.ndarray)
-        assert result[0].shape == (4,)
-        assert np.allclose(result[0], 0)
-
-        assert isinstance(result[1], numpy.ndarray)
-        assert result[1].shape == (4,)
-        assert np.allclose(result[1], 0)
-
-        assert isinstance(result[2], numpy.ndarray)
-        assert result[2].shape == (4,)
-        assert np.allclose(result[2], 0)
-
-        tapes, _ = spsa_grad(circuit.tape)
-        assert tapes == []
-
-    def test_all_zero_diff_methods_multiple_returns(self):
-        """Test that the transform works correctly when the diff method for every parameter is
-        identified to be 0, and that no tapes were generated, with multiple return values."""
-
-        dev = qml.device("default.qubit", wires=4)
-
-        @qml.qnode(dev)
+        identified to be 0, and that no tapes were generated, with single and multiple return
+        values."""
+        measurements = {
+            "expval": lambda: qml.expval(qml.PauliZ(wires=2)),
+            "probs": lambda: qml.probs([2, 3]),
+        }
+        shapes = {"expval": (), "probs": (4,)}
+        multiple_returns = isinstance(return_type, tuple)
+        return_types = return_type if multiple_returns else (return_type,)
+
+        @qml.qnode(dev4)
         def circuit(params):
             qml.Rot(*params, wires=0)
-            return qml.expval(qml.PauliZ(wires=2)), qml.probs([2, 3])
+            if multiple_returns:
+                return tuple(measurements[r]() for r in return_types)
+            return measurements[return_type]()
 
         params = np.array([0.5, 0.5, 0.5], requires_grad=True)
 
         result = spsa_grad(circuit)(params)
 
         assert isinstance(result, tuple)
+        result = result if multiple_returns else (result,)
+        assert len(result) == len(return_types)
 
-        assert len(result) == 2
-
-        # First elem
-        assert len(result[0]) == 3
-
-        assert isinstance(result[0][0], numpy.ndarray)
-        assert result[0][0].shape == ()
-        assert np.allclose(result[0][0], 0)
-
-        assert isinstance(result[0][1], numpy.ndarray)
-        assert result[0][1].shape == ()
-        assert np.allclose(result[0][1], 0)
-
-        assert isinstance(result[0][2], numpy.ndarray)
-        assert result[0][2].shape == ()
-        assert np.allclose(result[0][2], 0)
-
-        # Second elem
-        assert len(result[0]) == 3
-
-        assert isinstance(result[1][0], numpy.ndarray)
-        assert result[1][0].shape == (4,)
-        assert np.allclose(result[1][0], 0)
-
-        assert isinstance(result[1][1], numpy.ndarray)
-        assert result[1][1].shape == (4,)
-        assert np.allclose(result[1][1], 0)
-
-        assert isinstance(result[1][2], numpy.ndarray)
-        assert result[1][2].shape == (4,)
-        assert np.allclose(result[1][2], 0)
+        for res, r_type in zip(result, return_types):
+            # One entry per parameter
+            assert len(res) == 3
+            for r in res:
+                assert isinstance(r, numpy.ndarray)
+                assert r.shape == shapes[r_type]
+                assert np.allclose(r, 0)
 
         tapes, _ = spsa_grad(circuit.tape)
         assert tapes == []
@@ -308,62 +375,49 @@ class TestSpsaGradient:
     def test_y0(self, mocker):
         """Test that if first order finite differences is underlying the SPSA, then
         the tape is executed only once using the current parameter values."""
-        dev = qml.device("default.qubit", wires=2)
 
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(0.543, wires=[0])
-            qml.RY(-0.654, wires=[0])
-            qml.expval(qml.PauliZ(0))
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(
+            [qml.RX(0.543, wires=[0]), qml.RY(-0.654, wires=[0])], [qml.expval(qml.PauliZ(0))]
+        )
         n = 13
         tapes, fn = spsa_grad(tape, strategy="forward", approx_order=1, num_directions=n)
 
         # one tape per direction, plus one global call
         assert len(tapes) == n + 1
 
-    def test_y0_provided(self):
+    def test_y0_provided(self, dev2):
         """Test that by providing y0 the number of tapes is equal the number of parameters."""
-        dev = qml.device("default.qubit", wires=2)
 
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(0.543, wires=[0])
-            qml.RY(-0.654, wires=[0])
-            qml.expval(qml.PauliZ(0))
-
-        tape = qml.tape.QuantumScript.from_queue(q)
-        f0 = dev.execute(tape)
+        tape = qml.tape.QuantumScript(
+            [qml.RX(0.543, wires=[0]), qml.RY(-0.654, wires=[0])], [qml.expval(qml.PauliZ(0))]
+        )
+        f0 = dev2.execute(tape)
         n = 9
         tapes, fn = spsa_grad(tape, strategy="forward", approx_order=1, num_directions=n, f0=f0)
         # one tape per direction, the unshifted one already was evaluated above
         assert len(tapes) == n
 
-    def test_independent_parameters(self):
+    def test_independent_parameters(self, dev2):
         """Test the case where expectation values are independent of some parameters. For those
         parameters, the gradient should be evaluated to zero without executing the device."""
-        dev = qml.device("default.qubit", wires=2)
 
-        with qml.queuing.AnnotatedQueue() as q1:
-            qml.RX(1.0, wires=[0])
-            qml.RX(1.0, wires=[1])
-            qml.expval(qml.PauliZ(0))
-
-        tape1 = qml.tape.QuantumScript.from_queue(q1)
-        with qml.queuing.AnnotatedQueue() as q2:
-            qml.RX(1.0, wires=[0])
-            qml.RX(1.0, wires=[1])
-            qml.expval(qml.PauliZ(1))
-
-        tape2 = qml.tape.QuantumScript.from_queue(q2)
+        tape1 = qml.tape.QuantumScript(
+            [qml.RX(1.0, wires=[0]), qml.RX(1.0, wires=[1])], [qml.expval(qml.PauliZ(0))]
+        )
+        tape2 = qml.tape.QuantumScript(
+            [qml.RX(1.0, wires=[0]), qml.RX(1.0, wires=[1])], [qml.expval(qml.PauliZ(1))]
+        )
         n1 = 5
         tapes, fn = spsa_grad(tape1, approx_order=1, strategy="forward", num_directions=n1)
-        j1 = fn(dev.batch_execute(tapes))
+        num_executions = dev2.num_executions
+        j1 = fn(dev2.batch_execute(tapes))
 
-        assert len(tapes) == dev.num_executions == n1 + 1
+        # the device is shared across the module, so only count the executions of this batch
+        assert len(tapes) == dev2.num_executions - num_executions == n1 + 1
 
         n2 = 11
         tapes, fn = spsa_grad(tape2, num_directions=n2)
-        j2 = fn(dev.batch_execute(tapes))
+        j2 = fn(dev2.batch_execute(tapes))
 
         assert len(tapes) == 2 * n2
 
@@ -374,9 +428,8 @@ class TestSpsaGradient:
         assert np.allclose(j1, [exp, 0])
         assert np.allclose(j2, [0, exp])
 
-    def test_output_shape_matches_qnode(self):
+    def test_output_shape_matches_qnode(self, dev4):
         """Test that the transform output shape matches that of the QNode."""
-        dev = qml.device("default.qubit", wires=4)
 
         def cost1(x):
             qml.Rot(*x, wires=0)
@@ -403,7 +456,7 @@ class TestSpsaGradient:
             return qml.probs([0, 1]), qml.probs([2, 3])
 
         x = np.random.rand(3)
-        circuits = [qml.QNode(cost, dev) for cost in (cost1, cost2, cost3, cost4, cost5, cost6)]
+        circuits = [qml.QNode(cost, dev4) for cost in (cost1, cost2, cost3, cost4, cost5, cost6)]
 
         transform = [qml.math.shape(spsa_grad(c)(x)) for c in circuits]
 
@@ -486,20 +539,19 @@ class TestSpsaGradient:
 class TestSpsaGradientIntegration:
     """Tests for the SPSA gradient transform"""
 
-    def test_ragged_output(self, approx_order, strategy, validate):
+    def test_ragged_output(self, cached_batch_execute, dev3, approx_order, strategy, validate):
         """Test that the Jacobian is correctly returned for a tape with ragged output"""
-        dev = qml.device("default.qubit", wires=3)
         params = [1.0, 1.0, 1.0]
 
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(params[0], wires=[0])
-            qml.RY(params[1], wires=[1])
-            qml.RZ(params[2], wires=[2])
-            qml.CNOT(wires=[0, 1])
-            qml.probs(wires=0)
-            qml.probs(wires=[1, 2])
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(
+            [
+                qml.RX(params[0], wires=[0]),
+                qml.RY(params[1], wires=[1]),
+                qml.RZ(params[2], wires=[2]),
+                qml.CNOT(wires=[0, 1]),
+            ],
+            [qml.probs(wires=0), qml.probs(wires=[1, 2])],
+        )
         tapes, fn = spsa_grad(
             tape,
             approx_order=approx_order,
@@ -507,7 +559,7 @@ class TestSpsaGradientIntegration:
             num_directions=11,
             validate_params=validate,
         )
-        res = fn(dev.batch_execute(tapes))
+        res = fn(cached_batch_execute(dev3, tapes))
 
         assert isinstance(res, tuple)
 
@@ -523,20 +575,12 @@ class TestSpsaGradientIntegration:
         assert res[1][1].shape == (4,)
         assert res[1][2].shape == (4,)
 
-    def test_single_expectation_value(self, approx_order, strategy, validate, tol):
+    def test_single_expectation_value(
+        self, cached_batch_execute, dev2, base_ops, approx_order, strategy, validate, tol
+    ):
         """Tests correct output shape and evaluation for a tape
         with a single expval output"""
-        dev = qml.device("default.qubit", wires=2)
-        x = 0.543
-        y = -0.654
-
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(x, wires=[0])
-            qml.RY(y, wires=[1])
-            qml.CNOT(wires=[0, 1])
-            qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(base_ops, [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))])
         tapes, fn = spsa_grad(
             tape,
             h=1e-6,
@@ -546,7 +590,7 @@ class TestSpsaGradientIntegration:
             sampler=coordinate_sampler,
             validate_params=validate,
         )
-        res = fn(dev.batch_execute(tapes))
+        res = fn(cached_batch_execute(dev2, tapes))
 
         assert isinstance(res, tuple)
         assert len(res) == 2
@@ -562,24 +606,16 @@ class TestSpsaGradientIntegration:
         assert isinstance(res[1], numpy.ndarray)
         assert res[1].shape == ()
 
-        expected = np.array([[-np.sin(y) * np.sin(x), np.cos(y) * np.cos(x)]])
-        assert np.allclose(res, expected, atol=tol, rtol=0)
+        expected = _EXPECTED_SINGLE
+        assert _close(res, expected, atol=tol)
 
-    def test_single_expectation_value_with_argnum_all(self, approx_order, strategy, validate, tol):
+    def test_single_expectation_value_with_argnum_all(
+        self, cached_batch_execute, dev2, base_ops, approx_order, strategy, validate, tol
+    ):
         """Tests correct output shape and evaluation for a tape
         with a single expval output where all parameters are chosen to compute
         the jacobian"""
-        dev = qml.device("default.qubit", wires=2)
-        x = 0.543
-        y = -0.654
-
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(x, wires=[0])
-            qml.RY(y, wires=[1])
-            qml.CNOT(wires=[0, 1])
-            qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(base_ops, [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))])
         # we choose both trainable parameters
         tapes, fn = spsa_grad(
             tape,
@@ -590,7 +626,7 @@ class TestSpsaGradientIntegration:
             sampler=coordinate_sampler,
             validate_params=validate,
         )
-        res = fn(dev.batch_execute(tapes))
+        res = fn(cached_batch_execute(dev2, tapes))
 
         assert isinstance(res, tuple)
         assert len(res) == 2
@@ -606,10 +642,12 @@ class TestSpsaGradientIntegration:
         assert isinstance(res[1], numpy.ndarray)
         assert res[1].shape == ()
 
-        expected = np.array([[-np.sin(y) * np.sin(x), np.cos(y) * np.cos(x)]])
-        assert np.allclose(res, expected, atol=tol, rtol=0)
+        expected = _EXPECTED_SINGLE
+        assert _close(res, expected, atol=tol)
 
-    def test_single_expectation_value_with_argnum_one(self, approx_order, strategy, validate, tol):
+    def test_single_expectation_value_with_argnum_one(
+        self, cached_batch_execute, dev2, base_ops, approx_order, strategy, validate, tol
+    ):
         """Tests correct output shape and evaluation for a tape
         with a single expval output where only one parameter is chosen to
         estimate the jacobian.
@@ -617,17 +655,7 @@ class TestSpsaGradientIntegration:
         This test relies on the fact that exactly one term of the estimated
         jacobian will match the expected analytical value.
         """
-        dev = qml.device("default.qubit", wires=2)
-        x = 0.543
-        y = -0.654
-
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(x, wires=[0])
-            qml.RY(y, wires=[1])
-            qml.CNOT(wires=[0, 1])
-            qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(base_ops, [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))])
         # we choose only 1 trainable parameter - do not need to account for the multiplicative
         # error of using the coordinate_sampler
         tapes, fn = spsa_grad(
@@ -639,7 +667,7 @@ class TestSpsaGradientIntegration:
             sampler=coordinate_sampler,
             validate_params=validate,
         )
-        res = fn(dev.batch_execute(tapes))
+        res = fn(cached_batch_execute(dev2, tapes))
 
         assert isinstance(res, tuple)
         assert len(res) == 2
@@ -650,12 +678,12 @@ class TestSpsaGradientIntegration:
         assert isinstance(res[1], numpy.ndarray)
         assert res[1].shape == ()
 
-        expected = [0, np.cos(y) * np.cos(x)]
+        expected = [0, _COS_Y * _COS_X]
 
-        assert np.allclose(res, expected, atol=tol, rtol=0)
+        assert _close(res, expected, atol=tol)
 
     def test_multiple_expectation_value_with_argnum_one(
-        self, approx_order, strategy, validate, tol
+        self, cached_batch_execute, dev2, base_ops, approx_order, strategy, validate, tol
     ):
         """Tests correct output shape and evaluation for a tape
         with a multiple measurement, where only one parameter is chosen to
@@ -664,18 +692,9 @@ class TestSpsaGradientIntegration:
         This test relies on the fact that exactly one term of the estimated
         jacobian will match the expected analytical value.
         """
-        dev = qml.device("default.qubit", wires=2)
-        x = 0.543
-        y = -0.654
-
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(x, wires=[0])
-            qml.RY(y, wires=[1])
-            qml.CNOT(wires=[0, 1])
-            qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-            qml.probs(wires=[0, 1])
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(
+            base_ops, [qml.expval(qml.PauliZ(0) @ qml.PauliX(1)), qml.probs(wires=[0, 1])]
+        )
         # we choose only 1 trainable parameter - do not need to account for the multiplicative
         # error of using the coordinate_sampler
         tapes, fn = spsa_grad(
@@ -686,7 +705,7 @@ class TestSpsaGradientIntegration:
             sampler=coordinate_sampler,
             validate_params=validate,
         )
-        res = fn(dev.batch_execute(tapes))
+        res = fn(cached_batch_execute(dev2, tapes))
 
         assert isinstance(res, tuple)
         assert isinstance(res[0], tuple)
@@ -694,21 +713,14 @@ class TestSpsaGradientIntegration:
         assert isinstance(res[1], tuple)
         assert np.allclose(res[1][0], 0)
 
-    def test_multiple_expectation_values(self, approx_order, strategy, validate, tol):
+    def test_multiple_expectation_values(
+        self, cached_batch_execute, dev2, base_ops, approx_order, strategy, validate, tol
+    ):
         """Tests correct output shape and evaluation for a tape
         with multiple expval outputs"""
-        dev = qml.device("default.qubit", wires=2)
-        x = 0.543
-        y = -0.654
-
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(x, wires=[0])
-            qml.RY(y, wires=[1])
-            qml.CNOT(wires=[0, 1])
-            qml.expval(qml.PauliZ(0))
-            qml.expval(qml.PauliX(1))
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(
+            base_ops, [qml.expval(qml.PauliZ(0)), qml.expval(qml.PauliX(1))]
+        )
         tapes, fn = spsa_grad(
             tape,
             approx_order=approx_order,
@@ -717,7 +729,7 @@ class TestSpsaGradientIntegration:
             sampler=coordinate_sampler,
             validate_params=validate,
         )
-        res = fn(dev.batch_execute(tapes))
+        res = fn(cached_batch_execute(dev2, tapes))
 
         assert isinstance(res, tuple)
         assert len(res) == 2
@@ -729,31 +741,22 @@ class TestSpsaGradientIntegration:
 
         assert isinstance(res[0], tuple)
         assert len(res[0]) == 2
-        assert np.allclose(res[0], [-np.sin(x), 0], atol=tol, rtol=0)
+        assert _close(res[0], [-_SIN_X, 0], atol=tol)
         assert isinstance(res[0][0], numpy.ndarray)
         assert isinstance(res[0][1], numpy.ndarray)
 
         assert isinstance(res[1], tuple)
         assert len(res[1]) == 2
-        assert np.allclose(res[1], [0, np.cos(y)], atol=tol, rtol=0)
+        assert _close(res[1], [0, _COS_Y], atol=tol)
         assert isinstance(res[1][0], numpy.ndarray)
         assert isinstance(res[1][1], numpy.ndarray)
 
-    def test_var_expectation_values(self, approx_order, strategy, validate, tol):
+    def test_var_expectation_values(
+        self, cached_batch_execute, dev2, base_ops, approx_order, strategy, validate, tol
+    ):
         """Tests correct output shape and evaluation for a tape
         with expval and var outputs"""
-        dev = qml.device("default.qubit", wires=2)
-        x = 0.543
-        y = -0.654
-
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(x, wires=[0])
-            qml.RY(y, wires=[1])
-            qml.CNOT(wires=[0, 1])
-            qml.expval(qml.PauliZ(0))
-            qml.var(qml.PauliX(1))
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(base_ops, [qml.expval(qml.PauliZ(0)), qml.var(qml.PauliX(1))])
         tapes, fn = spsa_grad(
             tape,
             approx_order=approx_order,
@@ -762,7 +765,7 @@ class TestSpsaGradientIntegration:
             sampler=coordinate_sampler,
             num_directions=2,
         )
-        res = fn(dev.batch_execute(tapes))
+        res = fn(cached_batch_execute(dev2, tapes))
 
         assert isinstance(res, tuple)
         assert len(res) == 2
@@ -774,31 +777,24 @@ class TestSpsaGradientIntegration:
 
         assert isinstance(res[0], tuple)
         assert len(res[0]) == 2
-        assert np.allclose(res[0], [-np.sin(x), 0], atol=tol, rtol=0)
+        assert _close(res[0], [-_SIN_X, 0], atol=tol)
         assert isinstance(res[0][0], numpy.ndarray)
         assert isinstance(res[0][1], numpy.ndarray)
 
         assert isinstance(res[1], tuple)
         assert len(res[1]) == 2
-        assert np.allclose(res[1], [0, -2 * np.cos(y) * np.sin(y)], atol=tol, rtol=0)
+        assert _close(res[1], [0, -2 * _COS_Y * _SIN_Y], atol=tol)
         assert isinstance(res[1][0], numpy.ndarray)
         assert isinstance(res[1][1], numpy.ndarray)
 
-    def test_prob_expectation_values(self, approx_order, strategy, validate, tol):
+    def test_prob_expectation_values(
+        self, cached_batch_execute, dev2, base_ops, approx_order, strategy, validate, tol
+    ):
         """Tests correct output shape and evaluation for a tape
         with prob and expval outputs"""
-        dev = qml.device("default.qubit", wires=2)
-        x = 0.543
-        y = -0.654
-
-        with qml.queuing.AnnotatedQueue() as q:
-            qml.RX(x, wires=[0])
-            qml.RY(y, wires=[1])
-            qml.CNOT(wires=[0, 1])
-            qml.expval(qml.PauliZ(0))
-            qml.probs(wires=[0, 1])
-
-        tape = qml.tape.QuantumScript.from_queue(q)
+        tape = qml.tape.QuantumScript(
+            base_ops, [qml.expval(qml.PauliZ(0)), qml.probs(wires=[0, 1])]
+        )
         tapes, fn = spsa_grad(
             tape,
             approx_order=approx_order,
@@ -807,7 +803,7 @@ class TestSpsaGradientIntegration:
             sampler=coordinate_sampler,
             num_directions=2,
         )
-        res = fn(dev.batch_execute(tapes))
+        res = fn(cached_batch_execute(dev2, tapes))
 
         assert isinstance(res, tuple)
         assert len(res) == 2
@@ -819,256 +815,297 @@ class TestSpsaGradientIntegration:
 
         assert isinstance(res[0], tuple)
         assert len(res[0]) == 2
-        assert np.allclose(res[0][0], -np.sin(x), atol=tol, rtol=0)
+        assert _close(res[0][0], -_SIN_X, atol=tol)
         assert isinstance(res[0][0], numpy.ndarray)
-        assert np.allclose(res[0][1], 0, atol=tol, rtol=0)
+        assert _close(res[0][1], 0, atol=tol)
         assert isinstance(res[0][1], numpy.ndarray)
 
+        cos2_x, sin2_x = numpy.cos(_X / 2) ** 2, numpy.sin(_X / 2) ** 2
+        cos2_y, sin2_y = numpy.cos(_Y / 2) ** 2, numpy.sin(_Y / 2) ** 2
         assert isinstance(res[1], tuple)
         assert len(res[1]) == 2
-        assert np.allclose(
+        assert _close(
             res[1][0],
-            [
-                -(np.cos(y / 2) ** 2 * np.sin(x)) / 2,
-                -(np.sin(x) * np.sin(y / 2) ** 2) / 2,
-                (np.sin(x) * np.sin(y / 2) ** 2) / 2,
-                (np.cos(y / 2) ** 2 * np.sin(x)) / 2,
-            ],
+            [-cos2_y * _SIN_X / 2, -sin2_y * _SIN_X / 2, sin2_y * _SIN_X / 2, cos2_y * _SIN_X / 2],
             atol=tol,
-            rtol=0,
         )
         assert isinstance(res[1][0], numpy.ndarray)
-        assert np.allclose(
+        assert _close(
             res[1][1],
-            [
-                -(np.cos(x / 2) ** 2 * np.sin(y)) / 2,
-                (np.cos(x / 2) ** 2 * np.sin(y)) / 2,
-                (np.sin(x / 2) ** 2 * np.sin(y)) / 2,
-                -(np.sin(x / 2) ** 2 * np.sin(y)) / 2,
-            ],
+            [-cos2_x * _SIN_Y / 2, cos2_x * _SIN_Y / 2, sin2_x * _SIN_Y / 2, -sin2_x * _SIN_Y / 2],
             atol=tol,
-            rtol=0,
         )
         assert isinstance(res[1][1], numpy.ndarray)
 
 
+@pytest.fixture(scope="module")
+def template_tapes():
+    """Tapes of the non-ragged and the ragged circuit, with parameters that are rebound
+    in each evaluation of the cost functions."""
+    ops = [qml.RX(0.0, wires=[0]), qml.RY(0.0, wires=[1]), qml.CNOT(wires=[0, 1])]
+    return {
+        "full": qml.tape.QuantumScript(ops, [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))]),
+        "ragged": qml.tape.QuantumScript(ops, [qml.expval(qml.PauliZ(0)), qml.probs(wires=[1])]),
+    }
+
+
+@pytest.fixture(scope="module")
+def dev_autograd():
+    return qml.device("default.qubit.autograd", wires=2)
+
+
+@pytest.fixture(scope="module")
+def tf():
+    return pytest.importorskip("tensorflow")
+
+
+@pytest.fixture(scope="module")
+def torch():
+    return pytest.importorskip("torch")
+
+
+@pytest.fixture(scope="module")
+def jax():
+    jax_module = pytest.importorskip("jax")
+    # The dtype of a JAX device is fixed when it is created
+    jax_module.config.update("jax_enable_x64", True)
+    return jax_module
+
+
+@pytest.fixture(scope="module")
+def dev_tf(tf):
+    return qml.device("default.qubit.tf", wires=2)
+
+
+@pytest.fixture(scope="module")
+def dev_torch(torch):
+    return qml.device("default.qubit.torch", wires=2)
+
+
+@pytest.fixture(scope="module")
+def dev_jax(jax):
+    return qml.device("default.qubit.jax", wires=2)
+
+
+def _make_spsa_jac(
+    template_tapes, sampler, num_directions, merge_directions=False, broadcast=False
+):
+    """Create a function computing the SPSA Jacobian of a template tape at the parameters ``x``,
+    drawing its directions from a new seeded random number generator.
+    The coordinate_sampler produces the right evaluation points, but the results are
+    averaged instead of added, which is compensated by rescaling with ``num_directions``."""
+
+    rng = np.random.default_rng(42)
+
+    def jac(name, dev, x):
+        tape = template_tapes[name].copy(copy_operations=True)
+        tape.set_parameters([x[0], x[1]], trainable_only=False)
+        tape.trainable_params = [0, 1]
+        tapes, fn = spsa_grad(
+            tape,
+            n=1,
+            num_directions=num_directions,
+            sampler=sampler,
+            sampler_rng=rng,
+            merge_directions=merge_directions,
+            broadcast=broadcast,
+        )
+        # The tapes are executed on the device directly instead of with ``qml.execute`` and
+        # caching: the tape hashes do not resolve the small shifts of Torch parameters, whose
+        # string representation is rounded, nor those of parameters traced by ``jax.jit``
+        jac = fn(dev.batch_execute(tapes))
+        return _scale(jac, num_directions) if sampler is coordinate_sampler else jac
+
+    return jac
+
+
+@pytest.fixture(scope="module")
+def jitted_spsa_jac(template_tapes, jax, dev_jax):
+    """Function returning the compiled SPSA Jacobian of the non-ragged template tape on
+    ``dev_jax`` for the given options. The directions are drawn once while tracing, so the
+    compiled function can be shared by the test cases with the same options, for example
+    on different platforms. It is compiled on first use and kept for the module."""
+    costs = {}
+
+    def get(sampler, num_directions, merge_directions=False, broadcast=False):
+        key = (sampler, num_directions, merge_directions, broadcast)
+        if key not in costs:
+            jac = _make_spsa_jac(template_tapes, *key)
+            costs[key] = jax.jit(lambda x: jac("full", dev_jax, x))
+        return costs[key]
+
+    return get
+
+
+# Differentiated output of the SPSA Jacobian and its expected derivative, by template tape
+_VARIANTS = {
+    "full": (lambda jac: jac, _EXPECTED_HESSIAN),
+    "ragged": (lambda jac: jac[1][0], _EXPECTED_HESSIAN_RAGGED),
+}
+
+
 @pytest.mark.parametrize(
-    "sampler, num_directions, atol", [(_rademacher_sampler, 4, 0.5), (coordinate_sampler, 2, 1e-3)]
+    "sampler, num_directions, atol",
+    [
+        pytest.param(_rademacher_sampler, 4, 0.5, id="rademacher", marks=pytest.mark.stochastic),
+        pytest.param(coordinate_sampler, 2, 1e-3, id="coordinate", marks=pytest.mark.deterministic),
+    ],
 )
 class TestSpsaGradientDifferentiation:
     """Test that the transform is differentiable"""
 
+    @pytest.fixture
+    def spsa_jac(self, template_tapes, sampler, num_directions):
+        """Function computing the SPSA Jacobian of a template tape, see ``_make_spsa_jac``."""
+        return _make_spsa_jac(template_tapes, sampler, num_directions)
+
     @pytest.mark.autograd
-    def test_autograd(self, sampler, num_directions, atol):
-        """Tests that the output of the SPSA gradient transform
-        can be differentiated using autograd, yielding second derivatives."""
-        dev = qml.device("default.qubit.autograd", wires=2)
-        params = np.array([0.543, -0.654], requires_grad=True)
-        np.random.seed(42)
+    @pytest.mark.parametrize("variant", ["full", "ragged"])
+    def test_autograd(self, spsa_jac, dev_autograd, atol, variant):
+        """Tests that the output of the SPSA gradient transform of a tape with a single or
+        with ragged measurements can be differentiated using autograd, yielding second
+        derivatives."""
+        select, expected = _VARIANTS[variant]
+        params = np.array([_X, _Y], requires_grad=True)
 
         def cost_fn(x):
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(x[0], wires=[0])
-                qml.RY(x[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-            tape = qml.tape.QuantumScript.from_queue(q)
-            tape.trainable_params = {0, 1}
-            tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
-            jac = np.array(fn(dev.batch_execute(tapes)))
-            if sampler == coordinate_sampler:
-                jac *= 2
-            return jac
+            return np.array(select(spsa_jac(variant, dev_autograd, x)))
 
         res = qml.jacobian(cost_fn)(params)
-        x, y = params
-        expected = np.array(
-            [
-                [-np.cos(x) * np.sin(y), -np.cos(y) * np.sin(x)],
-                [-np.cos(y) * np.sin(x), -np.cos(x) * np.sin(y)],
-            ]
-        )
+        numpy.testing.assert_allclose(res, expected, atol=atol, rtol=0)
 
-        assert np.allclose(res, expected, atol=atol, rtol=0)
+    @pytest.mark.tf
+    @pytest.mark.slow
+    @pytest.mark.parametrize("variant", ["full", "ragged"])
+    def test_tf(self, spsa_jac, tf, dev_tf, atol, variant):
+        """Tests that the output of the SPSA gradient transform of a tape with a single or
+        with ragged measurements can be differentiated using TF, yielding second derivatives."""
+        select, expected = _VARIANTS[variant]
+        params = tf.Variable([_X, _Y], dtype=tf.float64)
 
-    @pytest.mark.autograd
-    def test_autograd_ragged(self, sampler, num_directions, atol):
-        """Tests that the output of the SPSA gradient transform
-        of a ragged tape can be differentiated using autograd, yielding second derivatives."""
-        dev = qml.device("default.qubit.autograd", wires=2)
-        params = np.array([0.543, -0.654], requires_grad=True)
-        np.random.seed(42)
+        with tf.GradientTape() as t:
+            jac = tf.stack(select(spsa_jac(variant, dev_tf, params)))
 
-        def cost_fn(x):
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(x[0], wires=[0])
-                qml.RY(x[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0))
-                qml.probs(wires=[1])
-
-            tape = qml.tape.QuantumScript.from_queue(q)
-            tape.trainable_params = {0, 1}
-            tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
-            jac = fn(dev.batch_execute(tapes))
-            if sampler == coordinate_sampler:
-                jac = tuple(tuple(2 * _j for _j in _jac) for _jac in jac)
-            return jac[1][0]
-
-        x, y = params
-        res = qml.jacobian(cost_fn)(params)[0]
-        expected = np.array([-np.cos(x) * np.cos(y) / 2, np.sin(x) * np.sin(y) / 2])
-        assert np.allclose(res, expected, atol=atol, rtol=0)
+        res = t.jacobian(jac, params)
 
-    @pytest.mark.tf
-    @pytest.mark.slow
-    def test_tf(self, sampler, num_directions, atol):
+        numpy.testing.assert_allclose(res.numpy(), expected, atol=atol, rtol=0)
+
+    @pytest.mark.torch
+    @pytest.mark.parametrize("torch_device", [None, pytest.param("cuda", marks=pytest.mark.gpu)])
+    def test_torch(self, spsa_jac, torch, dev_torch, atol, torch_device):
         """Tests that the output of the SPSA gradient transform
-        can be differentiated using TF, yielding second derivatives."""
-        import tensorflow as tf
-
-        dev = qml.device("default.qubit.tf", wires=2)
-        params = tf.Variable([0.543, -0.654], dtype=tf.float64)
-        np.random.seed(42)
-
-        with tf.GradientTape(persistent=True) as t:
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(params[0], wires=[0])
-                qml.RY(params[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-            tape = qml.tape.QuantumScript.from_queue(q)
-            tape.trainable_params = {0, 1}
-            tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
-            jac_0, jac_1 = fn(dev.batch_execute(tapes))
-            if sampler == coordinate_sampler:
-                jac_0 *= 2
-                jac_1 *= 2
-
-        x, y = 1.0 * params
-
-        res_0 = t.jacobian(jac_0, params)
-        res_1 = t.jacobian(jac_1, params)
-
-        expected = np.array(
-            [
-                [-np.cos(x) * np.sin(y), -np.cos(y) * np.sin(x)],
-                [-np.cos(y) * np.sin(x), -np.cos(x) * np.sin(y)],
-            ]
+        can be differentiated using Torch, yielding second derivatives."""
+        if torch_device == "cuda" and not torch.cuda.is_available():
+            pytest.skip("No GPU available")
+
+        params = torch.tensor(
+            [_X, _Y], dtype=torch.float64, requires_grad=True, device=torch_device
         )
-        assert np.allclose([res_0, res_1], expected, atol=atol, rtol=0)
 
-    @pytest.mark.tf
-    @pytest.mark.slow
-    def test_tf_ragged(self, sampler, num_directions, atol):
-        """Tests that the output of the SPSA gradient transform
-        of a ragged tape can be differentiated using TF, yielding second derivatives."""
-        import tensorflow as tf
+        def cost_fn(params):
+            return torch.stack(spsa_jac("full", dev_torch, params))
+
+        hess = torch.autograd.functional.jacobian(cost_fn, params, vectorize=True)
+
+        numpy.testing.assert_allclose(
+            hess.detach().cpu().numpy(), _EXPECTED_HESSIAN, atol=atol, rtol=0
+        )
 
-        dev = qml.device("default.qubit.tf", wires=2)
-        params = tf.Variable([0.543, -0.654], dtype=tf.float64)
-        np.random.seed(42)
+    @pytest.mark.jax
+    @pytest.mark.parametrize("jax_platform", [None, pytest.param("gpu", marks=pytest.mark.gpu)])
+    def test_jax(self, jitted_spsa_jac, jax, sampler, num_directions, atol, jax_platform):
+        """Tests that the output of the SPSA gradient transform
+        can be differentiated using JAX, yielding second derivatives."""
+        params = jax.numpy.array([_X, _Y])
+        if jax_platform is not None:
+            try:
+                params = jax.device_put(params, jax.devices(jax_platform)[0])
+            except RuntimeError:
+                pytest.skip("No GPU available")
+
+        cost_fn = jitted_spsa_jac(sampler, num_directions)
+        res = jax.jacobian(cost_fn)(params)
+        assert isinstance(res, tuple)
+        numpy.testing.assert_allclose(jax.numpy.stack(res), _EXPECTED_HESSIAN, atol=atol, rtol=0)
 
-        with tf.GradientTape(persistent=True) as t:
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(params[0], wires=[0])
-                qml.RY(params[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0))
-                qml.probs(wires=[1])
 
-            tape = qml.tape.QuantumScript.from_queue(q)
-            tape.trainable_params = {0, 1}
-            tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
+class TestSpsaGradientDifferentiationOptions:
+    """Test that the transform is differentiable with the options that change its tapes"""
 
-            jac_01 = fn(dev.batch_execute(tapes))[1][0]
-            if sampler == coordinate_sampler:
-                jac_01 *= 2
+    @pytest.mark.autograd
+    def test_merge_directions_autograd(self, template_tapes, dev_autograd):
+        """Tests that the output of the SPSA gradient transform with merged directions can be
+        differentiated using autograd, yielding second derivatives. Each coordinate direction
+        is sampled with both signs, and the negated directions share the shifted tapes."""
 
-        x, y = 1.0 * params
+        def sampler(indices, num_params, idx, seed=None, rng=None):
+            return (-1) ** (idx // len(indices)) * coordinate_sampler(indices, num_params, idx)
 
-        res_01 = t.jacobian(jac_01, params)
+        tapes, _ = spsa_grad(template_tapes["full"], num_directions=4, sampler=sampler)
+        merged_tapes, _ = spsa_grad(
+            template_tapes["full"], num_directions=4, sampler=sampler, merge_directions=True
+        )
+        assert len(merged_tapes) == len(tapes) // 2
 
-        expected = np.array([-np.cos(x) * np.cos(y) / 2, np.sin(x) * np.sin(y) / 2])
+        spsa_jac = _make_spsa_jac(template_tapes, sampler, 4, merge_directions=True)
+        params = np.array([_X, _Y], requires_grad=True)
 
-        assert np.allclose(res_01[0], expected, atol=atol, rtol=0)
+        def cost_fn(x):
+            # Each coordinate is sampled twice in four directions, so the average is rescaled by 2
+            return 2 * np.array(spsa_jac("full", dev_autograd, x))
 
-    @pytest.mark.torch
-    def test_torch(self, sampler, num_directions, atol):
-        """Tests that the output of the SPSA gradient transform
-        can be differentiated using Torch, yielding second derivatives."""
-        import torch
+        res = qml.jacobian(cost_fn)(params)
+        numpy.testing.assert_allclose(res, _EXPECTED_HESSIAN, atol=1e-3, rtol=0)
 
-        dev = qml.device("default.qubit.torch", wires=2)
-        params = torch.tensor([0.543, -0.654], dtype=torch.float64, requires_grad=True)
-        np.random.seed(42)
+    @pytest.fixture
+    def broadcast_jac(self, template_tapes):
+        """Function computing the SPSA Jacobian of a template tape with a single broadcasted
+        tape per shift, see ``_make_spsa_jac``."""
+        return _make_spsa_jac(template_tapes, coordinate_sampler, 2, broadcast=True)
 
-        def cost_fn(params):
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(params[0], wires=[0])
-                qml.RY(params[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
+    @pytest.mark.autograd
+    def test_broadcast_autograd(self, broadcast_jac, dev_autograd):
+        """Tests that the output of the SPSA gradient transform with broadcasting can be
+        differentiated using autograd, yielding second derivatives."""
+        params = np.array([_X, _Y], requires_grad=True)
 
-            tape = qml.tape.QuantumScript.from_queue(q)
-            tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
-            jac = fn(dev.batch_execute(tapes))
-            if sampler == coordinate_sampler:
-                jac = tuple(2 * _jac for _jac in jac)
-            return jac
+        def cost_fn(x):
+            return np.array(broadcast_jac("full", dev_autograd, x))
 
-        hess = torch.autograd.functional.jacobian(cost_fn, params)
+        res = qml.jacobian(cost_fn)(params)
+        numpy.testing.assert_allclose(res, _EXPECTED_HESSIAN, atol=1e-3, rtol=0)
 
-        x, y = params.detach().numpy()
+    @pytest.mark.tf
+    def test_broadcast_tf(self, broadcast_jac, tf, dev_tf):
+        """Tests that the output of the SPSA gradient transform with broadcasting can be
+        differentiated using TF, yielding second derivatives."""
+        params = tf.Variable([_X, _Y], dtype=tf.float64)
 
-        expected = np.array(
-            [
-                [-np.cos(x) * np.sin(y), -np.cos(y) * np.sin(x)],
-                [-np.cos(y) * np.sin(x), -np.cos(x) * np.sin(y)],
-            ]
-        )
+        with tf.GradientTape() as t:
+            jac = tf.stack(broadcast_jac("full", dev_tf, params))
 
-        assert np.allclose(hess[0].detach().numpy(), expected[0], atol=atol, rtol=0)
-        assert np.allclose(hess[1].detach().numpy(), expected[1], atol=atol, rtol=0)
+        res = t.jacobian(jac, params)
+        numpy.testing.assert_allclose(res.numpy(), _EXPECTED_HESSIAN, atol=1e-3, rtol=0)
 
-    @pytest.mark.jax
-    def test_jax(self, sampler, num_directions, atol):
-        """Tests that the output of the SPSA gradient transform
-        can be differentiated using JAX, yielding second derivatives."""
-        import jax
-        from jax import numpy as jnp
-        from jax.config import config
+    @pytest.mark.torch
+    def test_broadcast_torch(self, broadcast_jac, torch, dev_torch):
+        """Tests that the output of the SPSA gradient transform with broadcasting can be
+        differentiated using Torch, yielding second derivatives."""
+        params = torch.tensor([_X, _Y], dtype=torch.float64, requires_grad=True)
 
-        config.update("jax_enable_x64", True)
+        def cost_fn(params):
+            return torch.stack(broadcast_jac("full", dev_torch, params))
 
-        dev = qml.device("default.qubit.jax", wires=2)
-        params = jnp.array([0.543, -0.654])
-        np.random.seed(42)
+        hess = torch.autograd.functional.jacobian(cost_fn, params, vectorize=True)
+        numpy.testing.assert_allclose(hess.detach().numpy(), _EXPECTED_HESSIAN, atol=1e-3, rtol=0)
 
-        def cost_fn(x):
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(x[0], wires=[0])
-                qml.RY(x[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-            tape = qml.tape.QuantumScript.from_queue(q)
-            tape.trainable_params = {0, 1}
-            tapes, fn = spsa_grad(tape, n=1, num_directions=num_directions, sampler=sampler)
-            jac = fn(dev.batch_execute(tapes))
-            if sampler == coordinate_sampler:
-                jac = tuple(2 * _jac for _jac in jac)
-            return jac
+    @pytest.mark.jax
+    def test_broadcast_jax(self, jitted_spsa_jac, jax):
+        """Tests that the output of the SPSA gradient transform with broadcasting can be
+        differentiated using JAX, yielding second derivatives."""
+        params = jax.numpy.array([_X, _Y])
 
+        cost_fn = jitted_spsa_jac(coordinate_sampler, 2, broadcast=True)
         res = jax.jacobian(cost_fn)(params)
         assert isinstance(res, tuple)
-        x, y = params
-        expected = np.array(
-            [
-                [-np.cos(x) * np.sin(y), -np.cos(y) * np.sin(x)],
-                [-np.cos(y) * np.sin(x), -np.cos(x) * np.sin(y)],
-            ]
-        )
-        assert np.allclose(res, expected, atol=atol, rtol=0)
+        numpy.testing.assert_allclose(jax.numpy.stack(res), _EXPECTED_HESSIAN, atol=1e-3, rtol=0)
@@ -24,6 +24,7 @@ from pennylane._device import _process_shot_sequence, _get_num_copies
 from pennylane.gradients import spsa_grad
 from pennylane.devices import DefaultQubit
 from pennylane.operation import Observable, AnyWires
+from spsa_samplers import coordinate_sampler
 
 h_val = 0.1
 spsa_shot_vec_tol = 0.3
@@ -32,17 +33,6 @@ default_shot_vector = (1000, 2000, 3000)
 many_shots_shot_vector = tuple([100000] * 3)
 
 
-def coordinate_sampler(indices, num_params, idx, seed=None):
-    """Return a single canonical basis vector, corresponding
-    to the index ``indices[idx]``. This is a sequential coordinate sampler
-    that allows to exactly reproduce derivatives, instead of using SPSA in the
-    intended way."""
-    idx = idx % len(indices)
-    direction = np.zeros(num_params)
-    direction[indices[idx]] = 1.0
-    return direction
-
-
 class TestSpsaGradient:
     """Tests for the SPSA gradient transform"""
 
@@ -116,9 +106,8 @@ class TestSpsaGradient:
         assert len(spy.call_args_list) == num_directions
 
         # Never shift the independent parameter
-        for i in range(num_directions):
-            assert spy.call_args_list[i][0][0:2] == (tape, [0])
-            assert spy.call_args_list[i][0][2].shape == (2, 1)
+        calls = [(c.args[0], c.args[1], c.args[2].shape) for c in spy.call_args_list]
+        assert calls == [(tape, [0], (2, 1))] * num_directions
 
     def test_no_trainable_params_tape(self):
         """Test that the correct ouput and warning is generated in the absence of any trainable
@@ -193,6 +182,8 @@ class TestSpsaGradient:
     def test_no_trainable_params_qnode_torch(self):
         """Test that the correct ouput and warning is generated in the absence of any trainable
         parameters"""
+        pytest.importorskip("torch")
+
         dev = qml.device("default.qubit", wires=2, shots=default_shot_vector)
 
         @qml.qnode(dev, interface="torch")
@@ -211,6 +202,8 @@ class TestSpsaGradient:
     def test_no_trainable_params_qnode_tf(self):
         """Test that the correct ouput and warning is generated in the absence of any trainable
         parameters"""
+        pytest.importorskip("tensorflow")
+
         dev = qml.device("default.qubit", wires=2, shots=default_shot_vector)
 
         @qml.qnode(dev, interface="tf")
@@ -229,6 +222,8 @@ class TestSpsaGradient:
     def test_no_trainable_params_qnode_jax(self):
         """Test that the correct ouput and warning is generated in the absence of any trainable
         parameters"""
+        pytest.importorskip("jax")
+
         dev = qml.device("default.qubit", wires=2, shots=default_shot_vector)
 
         @qml.qnode(dev, interface="jax")
@@ -994,13 +989,10 @@ class TestSpsaGradientDifferentiation:
         np.random.seed(42)
 
         def cost_fn(x):
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(x[0], wires=[0])
-                qml.RY(x[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-            tape = qml.tape.QuantumScript.from_queue(q)
+            tape = qml.tape.QuantumScript(
+                [qml.RX(x[0], wires=[0]), qml.RY(x[1], wires=[1]), qml.CNOT(wires=[0, 1])],
+                [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))],
+            )
             tape.trainable_params = {0, 1}
             tapes, fn = spsa_grad(
                 tape,
@@ -1038,14 +1030,10 @@ class TestSpsaGradientDifferentiation:
         np.random.seed(42)
 
         def cost_fn(x):
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(x[0], wires=[0])
-                qml.RY(x[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0))
-                qml.probs(wires=[1])
-
-            tape = qml.tape.QuantumScript.from_queue(q)
+            tape = qml.tape.QuantumScript(
+                [qml.RX(x[0], wires=[0]), qml.RY(x[1], wires=[1]), qml.CNOT(wires=[0, 1])],
+                [qml.expval(qml.PauliZ(0)), qml.probs(wires=[1])],
+            )
             tape.trainable_params = {0, 1}
             tapes, fn = spsa_grad(
                 tape,
@@ -1080,13 +1068,14 @@ class TestSpsaGradientDifferentiation:
         np.random.seed(42)
 
         with tf.GradientTape(persistent=True) as t:
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(params[0], wires=[0])
-                qml.RY(params[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-            tape = qml.tape.QuantumScript.from_queue(q)
+            tape = qml.tape.QuantumScript(
+                [
+                    qml.RX(params[0], wires=[0]),
+                    qml.RY(params[1], wires=[1]),
+                    qml.CNOT(wires=[0, 1]),
+                ],
+                [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))],
+            )
             tape.trainable_params = {0, 1}
             tapes, fn = spsa_grad(
                 tape,
@@ -1122,14 +1111,14 @@ class TestSpsaGradientDifferentiation:
         np.random.seed(42)
 
         with tf.GradientTape(persistent=True) as t:
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(params[0], wires=[0])
-                qml.RY(params[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0))
-                qml.probs(wires=[1])
-
-            tape = qml.tape.QuantumScript.from_queue(q)
+            tape = qml.tape.QuantumScript(
+                [
+                    qml.RX(params[0], wires=[0]),
+                    qml.RY(params[1], wires=[1]),
+                    qml.CNOT(wires=[0, 1]),
+                ],
+                [qml.expval(qml.PauliZ(0)), qml.probs(wires=[1])],
+            )
             tape.trainable_params = {0, 1}
             tapes, fn = spsa_grad(
                 tape,
@@ -1161,13 +1150,14 @@ class TestSpsaGradientDifferentiation:
         np.random.seed(42)
 
         def cost_fn(params):
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(params[0], wires=[0])
-                qml.RY(params[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-            tape = qml.tape.QuantumScript.from_queue(q)
+            tape = qml.tape.QuantumScript(
+                [
+                    qml.RX(params[0], wires=[0]),
+                    qml.RY(params[1], wires=[1]),
+                    qml.CNOT(wires=[0, 1]),
+                ],
+                [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))],
+            )
             tapes, fn = spsa_grad(
                 tape,
                 n=1,
@@ -1208,13 +1198,10 @@ class TestSpsaGradientDifferentiation:
         np.random.seed(42)
 
         def cost_fn(x):
-            with qml.queuing.AnnotatedQueue() as q:
-                qml.RX(x[0], wires=[0])
-                qml.RY(x[1], wires=[1])
-                qml.CNOT(wires=[0, 1])
-                qml.expval(qml.PauliZ(0) @ qml.PauliX(1))
-
-            tape = qml.tape.QuantumScript.from_queue(q)
+            tape = qml.tape.QuantumScript(
+                [qml.RX(x[0], wires=[0]), qml.RY(x[1], wires=[1]), qml.CNOT(wires=[0, 1])],
+                [qml.expval(qml.PauliZ(0) @ qml.PauliX(1))],
+            )
             tape.trainable_params = {0, 1}
             tapes, fn = spsa_grad(
                 tape,
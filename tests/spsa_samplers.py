@@ -0,0 +1,33 @@
+# Copyright 2018-2021 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Deterministic direction samplers for testing the SPSA gradient transform"""
+from functools import lru_cache
+
+from pennylane import numpy as np
+
+
+@lru_cache(maxsize=8)
+def _basis(num_params):
+    """Return the (read-only) canonical basis of a ``num_params``-dimensional space."""
+    basis = np.eye(num_params, dtype=np.float32)
+    basis.setflags(write=False)
+    return basis
+
+
+def coordinate_sampler(indices, num_params, idx, seed=None, rng=None):
+    """Return a single canonical basis vector, corresponding
+    to the index ``indices[idx]``. This is a sequential coordinate sampler
+    that allows to exactly reproduce derivatives, instead of using SPSA in the
+    intended way."""
+    return _basis(num_params)[indices[idx % len(indices)]]